@@ -2,17 +2,30 @@
 """
 완전 개선된 Flask 백엔드
 - 3가지 AI 개선사항 모두 통합
+- 서비스 초기화는 create_app() 에서 (python app.py 또는 gunicorn 'app:create_app()')
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from model.infer import run_inference
 from utils.analysis import analyze_results
-from utils.heatmap import generate_heatmap
-from utils.room_segmentation import visualize_room_zones, calculate_area_coverage
-from utils.stacking_visualizer import visualize_stacks
-from utils.object_tracker import get_tracker
-from db import init_db, save_analysis, get_history, get_statistics
+from utils.room_segmentation import calculate_area_coverage
+from utils.result_views import ResultViewCache, view_filename, parse_view_filename
+from utils.render_pool import RenderPool
+from utils.image_encoding import ImageEncoder
+from utils.artifact_store import ArtifactStore
+from utils.advice import AdviceService
+from utils.advice_cache import AdviceCache
+from utils.history_writer import HistoryWriter
+from utils.job_queue import AnalysisJobQueue
+from utils.history_archive import archive_old_analyses
+from utils.object_tracker import tracker_session, get_tracker_registry, is_valid_room, RoomLimitError, DEFAULT_ROOM
+from db import init_db, save_analysis, get_history_page, iter_history, get_statistics, get_object_frequency, get_trend, release_connection, close_all as close_db
 import os
+import json
+import time
+import atexit
+import threading
+from datetime import datetime
 from dotenv import load_dotenv
 from openai import OpenAI
 
@@ -21,7 +34,19 @@ from openai import OpenAI
 # ============================================
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# stream: 조언을 SSE 로 따로 전달, sync: /analyze 응답에 포함
+ADVICE_MODE = os.getenv("ADVICE_MODE", "stream")
+ADVICE_TIMEOUT = float(os.getenv("ADVICE_TIMEOUT", "60"))
+ADVICE_READ_TIMEOUT = float(os.getenv("ADVICE_READ_TIMEOUT", "20"))  # 스트림 토큰 사이 최대 대기
+ADVICE_TTL = float(os.getenv("ADVICE_TTL", "600"))
+ADVICE_WORKERS = int(os.getenv("ADVICE_WORKERS", "4"))
+# 같은 방 상태(물체 구성, 위치 분포, 점수 구간)의 조언 재사용
+ADVICE_CACHE = os.getenv("ADVICE_CACHE", "true").lower() == "true"
+ADVICE_CACHE_TTL_HOURS = float(os.getenv("ADVICE_CACHE_TTL_HOURS", "168"))
+ADVICE_CACHE_MAX = int(os.getenv("ADVICE_CACHE_MAX", "5000"))
+
+# OPENAI_BASE_URL 로 다른 서버(예: stub_llm_server.py)를 쓸 수 있음
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=ADVICE_TIMEOUT)
 if not os.getenv("OPENAI_API_KEY"):
     print("⚠️ WARNING: OPENAI_API_KEY 환경변수가 설정되지 않았습니다!")
 
@@ -35,11 +60,58 @@ CORS(
 
 UPLOAD_FOLDER = 'uploads'
 RESULT_FOLDER = 'results'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(RESULT_FOLDER, exist_ok=True)
+STATE_FOLDER = 'analysis_state'
+# 저장소 용량 예산 (초과 시 가장 오래 안 쓰인 파일부터 삭제)
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "1024"))
+RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "512"))
+# 결과 이미지 인코딩 (jpeg | webp) 및 썸네일 너비
+RESULT_FORMAT = os.getenv("RESULT_FORMAT", "jpeg")
+RESULT_QUALITY = int(os.getenv("RESULT_QUALITY", "82"))
+RESULT_PROGRESSIVE = os.getenv("RESULT_PROGRESSIVE", "1") == "1"
+RESULT_THUMB_WIDTHS = [
+    int(w) for w in os.getenv("RESULT_THUMB_WIDTHS", "320,640,1280").split(",") if w.strip()
+]
+# lazy: /results 요청 시 렌더링, eager: /analyze 직후 백그라운드 렌더링
+RENDER_MODE = os.getenv("RENDER_MODE", "lazy")
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_MAX_QUEUE = int(os.getenv("RENDER_MAX_QUEUE", "32"))
+RENDER_WAIT_SECONDS = float(os.getenv("RENDER_WAIT_SECONDS", "2.0"))
+# ?v= 가 현재 설정과 같은 결과 이미지의 브라우저 캐시 기간 (기본 1년)
+RESULT_MAX_AGE = int(os.getenv("RESULT_MAX_AGE", str(365 * 24 * 3600)))
+# /history 한 페이지 최대 크기 (더 이전 기록은 next_cursor 로)
+HISTORY_MAX_PAGE = int(os.getenv("HISTORY_MAX_PAGE", "100"))
+# async: 분석 기록을 백그라운드에서 모아서 저장, sync: 요청 안에서 저장
+HISTORY_WRITE_MODE = os.getenv("HISTORY_WRITE_MODE", "async")
+HISTORY_WRITER_QUEUE = int(os.getenv("HISTORY_WRITER_QUEUE", "1000"))
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "50"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.5"))
+# 이 기간(일)이 지난 분석 기록은 월별 보관 파일로 옮김 (0 이면 보관하지 않음)
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "0"))
+HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR", "archive")
+HISTORY_ARCHIVE_INTERVAL_HOURS = float(os.getenv("HISTORY_ARCHIVE_INTERVAL_HOURS", "24"))
+# POST /analyze/async 작업 풀 (동시 실행 수, 대기열 한도, 끝난 작업 보관 시간)
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", "2"))
+ANALYZE_MAX_QUEUE = int(os.getenv("ANALYZE_MAX_QUEUE", "16"))
+ANALYZE_JOB_TTL = float(os.getenv("ANALYZE_JOB_TTL", "600"))
+ANALYZE_RETRY_AFTER = int(os.getenv("ANALYZE_RETRY_AFTER", "5"))
+# /jobs/<id> 에 표시되는 분석 파이프라인 단계 (progress 호출 순서)
+PIPELINE_STAGES = ('inference', 'analysis', 'state', 'tracking', 'advice', 'save')
+
+
+def _archive_loop():
+    """보관 기간이 지난 기록을 주기적으로 보관 파일로 옮김"""
+    while True:
+        try:
+            archive_old_analyses(HISTORY_RETENTION_DAYS, HISTORY_ARCHIVE_DIR)
+        except Exception as e:
+            print(f"⚠️ 기록 보관 실패: {e}")
+        time.sleep(HISTORY_ARCHIVE_INTERVAL_HOURS * 3600)
+
 
-# DB 초기화
-init_db()
+@app.teardown_appcontext
+def _release_db_connection(exc):
+    """요청이 끝나면 스레드의 DB 연결을 풀로 반환 (threaded 서버는 요청마다 새 스레드)"""
+    release_connection()
 
 
 @app.route('/')
@@ -48,162 +120,281 @@ def home():
 
 
 # ============================================
-# ChatGPT 조언 생성 (기존)
+# ChatGPT 조언 생성
 # ============================================
-def generate_ai_advice(detections, score):
-    """YOLO 감지 결과 기반으로 ChatGPT 정리 코칭 생성"""
-    try:
-        detected_items = ", ".join([d["name"] for d in detections]) or "아무것도 감지되지 않음"
+def advice_notes(problem_objects, stacks):
+    """조언 뒤에 붙는 반복 문제 / 쌓임 경고"""
+    notes = ""
 
-        prompt = f"""
-너는 최고 수준의 방 정리 전문가야.
+    # 추적 정보 추가
+    if problem_objects:
+        notes += "\n\n🔄 반복되는 문제:\n"
+        for prob in problem_objects[:3]:
+            notes += f"- {prob['message']}\n"
 
-아래는 YOLO가 감지한 방의 물건 리스트야:
-[{detected_items}]
+    # 쌓임 정보 추가
+    if stacks:
+        notes += "\n\n⚠️ 쌓임 주의:\n"
+        for stack in stacks[:3]:
+            notes += f"- {stack['message']}\n"
 
-이 방의 정리 점수는 {score}점이야.
+    return notes
 
-이 정보를 기반으로 다음을 5~8줄로 간결하게 한국어로 작성해줘.
-1) 방 전체 상태 요약
-2) 정리 우선순위 TOP 3
-3) 물건들을 어디에 정리하면 좋은지 (책상, 서랍, 옷장 등)
-4) 전체적인 정리 루틴 제안
-"""
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "너는 방 정리 전문가다."},
-                {"role": "user", "content": prompt}
-            ]
+# ============================================
+# 서비스 초기화
+# ============================================
+# create_app() 에서 생성 (import 만으로는 DB/파일/스레드에 손대지 않음)
+upload_store = None
+result_store = None
+result_encoder = None
+result_views = None
+render_pool = None
+history_writer = None
+advice_cache = None
+advice_service = None
+analysis_jobs = None
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def create_app():
+    """
+    서비스 객체 생성, DB 초기화, 백그라운드 스레드 시작 후 Flask 앱 반환
+
+    - 여러 번 호출해도 한 번만 초기화
+    - 부작용이 있는 초기화는 모두 여기에 둔다 (import 만으로는 실행되지 않음)
+    - WSGI 서버: gunicorn 'app:create_app()'
+    """
+    global upload_store, result_store, result_encoder, result_views
+    global render_pool, history_writer, advice_cache, advice_service, analysis_jobs
+    global _initialized
+
+    with _init_lock:
+        if _initialized:
+            return app
+
+        # 업로드/결과 파일은 내용 해시로 이름 붙여 저장 (원자적 쓰기 + LRU 삭제)
+        upload_store = ArtifactStore(
+            UPLOAD_FOLDER,
+            max_bytes=UPLOAD_MAX_MB * 1024 * 1024,
+            on_evict=lambda key, variant: result_views.drop_state(key)
+        )
+        result_store = ArtifactStore(
+            RESULT_FOLDER,
+            max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024
         )
 
-        advice = response.choices[0].message.content
-        return advice
+        # 결과 이미지는 /results 요청 시 렌더링 후 캐시
+        result_encoder = ImageEncoder(
+            fmt=RESULT_FORMAT,
+            quality=RESULT_QUALITY,
+            progressive=RESULT_PROGRESSIVE,
+            thumbnail_widths=RESULT_THUMB_WIDTHS
+        )
+        result_views = ResultViewCache(
+            result_store,
+            STATE_FOLDER,
+            encoder=result_encoder
+        )
+        render_pool = RenderPool(
+            result_views,
+            max_workers=RENDER_WORKERS,
+            max_queue=RENDER_MAX_QUEUE
+        )
+        atexit.register(render_pool.shutdown)
+
+        # DB 초기화
+        init_db()
+        atexit.register(close_db)
+
+        # 분석 기록 백그라운드 저장 (atexit 은 역순 실행 → DB 연결을 닫기 전에 남은 기록 저장)
+        history_writer = None
+        if HISTORY_WRITE_MODE == "async":
+            history_writer = HistoryWriter(
+                max_queue=HISTORY_WRITER_QUEUE,
+                batch_size=HISTORY_BATCH_SIZE,
+                flush_interval=HISTORY_FLUSH_INTERVAL
+            )
+            atexit.register(history_writer.shutdown)
 
-    except Exception as e:
-        print("ChatGPT 오류:", e)
-        return "정리 조언 생성에 실패했습니다."
+        if HISTORY_RETENTION_DAYS > 0:
+            threading.Thread(target=_archive_loop, name='history-archive', daemon=True).start()
 
+        advice_cache = None
+        if ADVICE_CACHE:
+            advice_cache = AdviceCache(
+                ttl=ADVICE_CACHE_TTL_HOURS * 3600,
+                max_entries=ADVICE_CACHE_MAX
+            )
+            atexit.register(advice_cache.close)
+
+        advice_service = AdviceService(
+            client,
+            timeout=ADVICE_TIMEOUT,
+            read_timeout=ADVICE_READ_TIMEOUT,
+            ttl=ADVICE_TTL,
+            max_workers=ADVICE_WORKERS,
+            cache=advice_cache
+        )
+        atexit.register(advice_service.shutdown)
+
+        # POST /analyze/async 작업 대기열
+        analysis_jobs = AnalysisJobQueue(
+            stages=PIPELINE_STAGES,
+            max_workers=ANALYZE_WORKERS,
+            max_queue=ANALYZE_MAX_QUEUE,
+            ttl=ANALYZE_JOB_TTL
+        )
+        atexit.register(analysis_jobs.shutdown)
 
-# ============================================
-# 🔥 메인 분석 API (완전 개선)
-# ============================================
-@app.route('/analyze', methods=['POST'])
-def analyze_image():
-    
-    # 파일 체크
-    if 'image' not in request.files:
-        return jsonify({'error': 'No image uploaded'}), 400
+        _initialized = True
+    return app
 
-    file = request.files['image']
-    filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(filepath)
 
+class AnalysisError(Exception):
+    """분석 파이프라인 실패 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def run_analysis_pipeline(image_key, filepath, image_name, room=DEFAULT_ROOM,
+                          render_mode=RENDER_MODE, progress=lambda stage: None):
+    """
+    저장된 업로드 이미지 하나를 분석 (/analyze, /analyze/async 공용)
+
+    Args:
+        progress: 각 단계 시작 시 단계 이름으로 호출 (PIPELINE_STAGES)
+
+    Returns:
+        dict: /analyze 응답 데이터
+
+    Raises:
+        AnalysisError: 추론/분석/상태 저장 실패
+    """
     # 1️⃣ 완전 개선된 추론 (Segmentation + 쌓임 탐지 포함)
+    progress('inference')
     try:
-        detections, result_img_path, room_masks, stacks = run_inference(filepath, RESULT_FOLDER)
+        detections, room_masks, stacks = run_inference(filepath)
         print(f"✅ 추론 완료: {len(detections)}개 객체, {len(stacks)}개 쌓임")
     except Exception as e:
-        return jsonify({'error': f'Model inference failed: {str(e)}'}), 500
+        raise AnalysisError(f'Model inference failed: {str(e)}')
 
     # 2️⃣ 분석 (쌓임 정보 포함)
+    progress('analysis')
     try:
         report = analyze_results(detections)
         print(f"✅ 분석 완료: 점수 {report['score']}점")
     except Exception as e:
-        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+        raise AnalysisError(f'Analysis failed: {str(e)}')
 
-    # 3️⃣ 히트맵 생성 (기존)
-    heatmap_path = None
-    if detections:
-        try:
-            heatmap_filename = 'heatmap_' + file.filename
-            heatmap_full_path = os.path.join(RESULT_FOLDER, heatmap_filename)
-            generate_heatmap(filepath, detections, heatmap_full_path)
-            heatmap_path = f"/results/{heatmap_filename}"
-            print("✅ 히트맵 생성 완료")
-        except Exception as e:
-            print(f"⚠️ 히트맵 생성 실패: {e}")
+    # 3️⃣ 분석 상태 저장 (결과/히트맵/구역/쌓임 이미지는 /results 요청 시 렌더링)
+    progress('state')
+    try:
+        views = result_views.save_state(
+            image_key, filepath, detections, stacks, room_masks
+        )
+    except Exception as e:
+        raise AnalysisError(f'Saving analysis state failed: {str(e)}')
+
+    # ?v= 렌더링 설정 지문 + 분석 상태 해시 → 둘 다 같으면 URL 내용이 바뀌지 않으므로 immutable 캐시 가능
+    version = result_views.version(image_key)
+    view_urls = {
+        view: f"/results/{view_filename(view, image_key)}?v={version}"
+        for view in views
+    }
+
+    # eager 모드: 모든 뷰를 백그라운드 풀에 제출 (응답은 기다리지 않음)
+    if render_mode == 'eager':
+        for view in views:
+            render_pool.submit(view_filename(view, image_key))
 
-    # 4️⃣ 구역 시각화 생성 (Segmentation)
-    zone_visualization_path = None
+    artifacts = {
+        view: {
+            "url": url,
+            "ready": render_pool.is_ready(view_filename(view, image_key))
+        }
+        for view, url in view_urls.items()
+    }
+
+    # 4️⃣ 구역 면적 비율 (Segmentation)
     area_coverage = None
-    
     if room_masks is not None:
         try:
-            zone_filename = 'zones_' + file.filename
-            zone_full_path = os.path.join(RESULT_FOLDER, zone_filename)
-            visualize_room_zones(filepath, room_masks, zone_full_path)
-            zone_visualization_path = f"/results/{zone_filename}"
-            
             area_coverage = calculate_area_coverage(room_masks)
-            print("✅ 구역 시각화 생성 완료")
-        except Exception as e:
-            print(f"⚠️ 구역 시각화 실패: {e}")
-
-    # 5️⃣ 쌓임 시각화 생성
-    stacking_image_path = None
-    
-    if stacks:
-        try:
-            stacking_filename = 'stacks_' + file.filename
-            stacking_full_path = os.path.join(RESULT_FOLDER, stacking_filename)
-            visualize_stacks(filepath, detections, stacks, stacking_full_path)
-            stacking_image_path = f"/results/{stacking_filename}"
-            print(f"✅ 쌓임 시각화 생성: {len(stacks)}개 그룹")
         except Exception as e:
-            print(f"⚠️ 쌓임 시각화 실패: {e}")
+            print(f"⚠️ 구역 면적 계산 실패: {e}")
 
-    # 6️⃣ 객체 추적 업데이트
-    tracker = get_tracker()
-    tracker.update(detections, file.filename)
-    
-    problem_objects = tracker.get_problem_objects(min_appearances=2)
-    tracking_stats = tracker.get_statistics()
+    # 5️⃣ 객체 추적 업데이트
+    progress('tracking')
+    try:
+        with tracker_session(room) as tracker:
+            tracker.update(detections, image_name)
+            
+            problem_objects = tracker.get_problem_objects(min_appearances=2)
+            tracking_stats = tracker.get_statistics()
+    except RoomLimitError as e:
+        raise AnalysisError(str(e), status_code=403)
     
     print(f"✅ 추적 완료: {len(problem_objects)}개 반복 문제")
 
-    # 7️⃣ ChatGPT 조언 생성 (추적 + 쌓임 정보 반영)
-    ai_advice = generate_ai_advice(detections, report["score"])
-    
-    # 추적 정보 추가
-    if problem_objects:
-        chronic_warning = "\n\n🔄 반복되는 문제:\n"
-        for prob in problem_objects[:3]:
-            chronic_warning += f"- {prob['message']}\n"
-        ai_advice += chronic_warning
-    
-    # 쌓임 정보 추가
-    if stacks:
-        stacking_warning = "\n\n⚠️ 쌓임 주의:\n"
-        for stack in stacks[:3]:
-            stacking_warning += f"- {stack['message']}\n"
-        ai_advice += stacking_warning
+    # 6️⃣ ChatGPT 조언 생성 (추적 + 쌓임 정보 반영)
+    # stream: 응답을 기다리지 않고 /advice/<id>/stream 으로 전달
+    progress('advice')
+    notes = advice_notes(problem_objects, stacks)
+    advice = None
+    ai_advice = None
+    advice_id = None
+    if ADVICE_MODE == "stream":
+        advice_id = advice_service.start(detections, report["score"], suffix=notes)
+        if advice_id is None:
+            print("⚠️ 생성 중인 조언이 가득 참 → 동기 생성으로 대체")
+    if advice_id is not None:
+        advice = {
+            "id": advice_id,
+            "stream_url": f"/advice/{advice_id}/stream"
+        }
+    else:
+        ai_advice = advice_service.generate(detections, report["score"]) + notes
 
-    # 8️⃣ DB 저장
+    # 7️⃣ DB 저장
+    progress('save')
     try:
-        save_analysis(
-            score=report['score'],
-            detections=detections,
-            report=report,
-            image_name=file.filename
-        )
-        print("✅ DB 저장 완료")
+        if history_writer:
+            history_writer.submit(
+                score=report['score'],
+                detections=detections,
+                report=report,
+                image_name=image_name
+            )
+        else:
+            save_analysis(
+                score=report['score'],
+                detections=detections,
+                report=report,
+                image_name=image_name
+            )
+            print("✅ DB 저장 완료")
     except Exception as e:
         print(f"⚠️ DB 저장 실패: {e}")
 
-    # 9️⃣ 최종 응답 데이터 구성
+    # 8️⃣ 최종 응답 데이터 구성
     response_data = {
         "status": "success",
         "detections": detections,
         "report": report,
         "ai_advice": ai_advice,
-        "result_image": f"/results/{os.path.basename(result_img_path)}",
+        "advice": advice,
+        "image_id": image_key,
+        "result_image": view_urls['result'],
+        "artifacts": artifacts,
         
         # 🔥 Segmentation 데이터
         "segmentation": {
-            "zone_image": zone_visualization_path,
+            "zone_image": view_urls.get('zones'),
             "area_coverage": area_coverage,
             "detected_areas": room_masks['detected_areas'] if room_masks else []
         },
@@ -211,7 +402,7 @@ def analyze_image():
         # 🔥 쌓임 데이터
         "stacking": {
             "stacks": stacks,
-            "stacking_image": stacking_image_path,
+            "stacking_image": view_urls.get('stacks'),
             "total_stacks": len(stacks),
             "warning": (
                 f"⚠️ {len(stacks)}개 그룹의 물건이 쌓여있거나 포개져있습니다!"
@@ -230,27 +421,241 @@ def analyze_image():
         }
     }
 
-    if heatmap_path:
-        response_data["heatmap_image"] = heatmap_path
+    if 'heatmap' in view_urls:
+        response_data["heatmap_image"] = view_urls['heatmap']
 
     print("✅ 모든 분석 완료!")
+    return response_data
+
+
+def _room_error(room):
+    """방 키 검사 → 오류 응답 (문제없으면 None)"""
+    if not is_valid_room(room):
+        return jsonify({'error': 'Invalid room'}), 400
+    if not get_tracker_registry().admits(room):
+        return jsonify({'error': 'Room limit reached'}), 403
+    return None
+
+
+def _store_upload(file):
+    """업로드 파일을 내용 해시로 저장 → (image_key, filepath)"""
+    # 내용 해시로 저장 (같은 이름의 다른 사진끼리 덮어쓰지 않고, 같은 사진은 한 번만 저장)
+    ext = os.path.splitext(file.filename)[1].lower().lstrip('.')
+    if not ext.isalnum():
+        ext = 'jpg'
+    image_key, filepath, _ = upload_store.put_content(file.read(), f'orig.{ext}')
+    return image_key, filepath
+
+
+# ============================================
+# 🔥 메인 분석 API (완전 개선)
+# ============================================
+@app.route('/analyze', methods=['POST'])
+def analyze_image():
+    
+    # 파일 체크
+    if 'image' not in request.files:
+        return jsonify({'error': 'No image uploaded'}), 400
+
+    file = request.files['image']
+
+    # 방(사용자)별 추적기
+    room = request.form.get('room', DEFAULT_ROOM)
+    error = _room_error(room)
+    if error:
+        return error
+
+    image_key, filepath = _store_upload(file)
+
+    try:
+        response_data = run_analysis_pipeline(
+            image_key, filepath, file.filename,
+            room=room,
+            render_mode=request.form.get('render', RENDER_MODE)
+        )
+    except AnalysisError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
     return jsonify(response_data)
 
 
+@app.route('/analyze/async', methods=['POST'])
+def analyze_image_async():
+    """
+    분석 작업 제출 → 작업 id 즉시 반환 (202)
+
+    진행 상태와 결과는 GET /jobs/<id>, 대기 중 취소는 POST /jobs/<id>/cancel
+    대기열이 가득 차면 429 + Retry-After
+    """
+    if 'image' not in request.files:
+        return jsonify({'error': 'No image uploaded'}), 400
+
+    file = request.files['image']
+
+    room = request.form.get('room', DEFAULT_ROOM)
+    error = _room_error(room)
+    if error:
+        return error
+
+    # 업로드는 요청 안에서 저장 (작업 스레드는 파일 경로만 받음)
+    image_key, filepath = _store_upload(file)
+
+    job = analysis_jobs.submit(
+        run_analysis_pipeline,
+        image_key, filepath, file.filename,
+        room=room,
+        render_mode=request.form.get('render', RENDER_MODE)
+    )
+    if job is None:
+        response = jsonify({'error': 'Too many queued analyses, try again later'})
+        response.headers['Retry-After'] = str(ANALYZE_RETRY_AFTER)
+        return response, 429
+
+    return jsonify({
+        "status": "accepted",
+        "job_id": job.id,
+        "image_id": image_key,
+        "status_url": f"/jobs/{job.id}",
+        "cancel_url": f"/jobs/{job.id}/cancel"
+    }), 202
+
+
+@app.route('/jobs/metrics', methods=['GET'])
+def get_job_metrics():
+    """분석 작업 대기열 지표"""
+    return jsonify({"status": "success", "jobs": analysis_jobs.metrics()})
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """분석 작업 상태 (단계별 진행, 끝나면 /analyze 와 같은 결과)"""
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({"status": "success", "job": job})
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """대기 중인 분석 작업 취소 (이미 실행 중이거나 끝났으면 409)"""
+    state = analysis_jobs.cancel(job_id)
+    if state is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if state != 'cancelled':
+        return jsonify({'error': f'Job is {state}', 'state': state}), 409
+    return jsonify({"status": "success", "state": state})
+
+
+@app.route('/advice/<advice_id>/stream', methods=['GET'])
+def stream_advice(advice_id):
+    """조언 토큰 스트리밍 (Server-Sent Events)"""
+    events = advice_service.stream(advice_id)
+    if events is None:
+        return jsonify({'error': 'Advice not found'}), 404
+
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/advice/metrics', methods=['GET'])
+def get_advice_metrics():
+    """조언 캐시 적중률 등 지표"""
+    return jsonify({
+        "status": "success",
+        "mode": ADVICE_MODE,
+        "cache": advice_cache.metrics() if advice_cache else None
+    })
+
+
+@app.route('/advice/<advice_id>/cancel', methods=['POST'])
+def cancel_advice(advice_id):
+    """조언 생성 취소"""
+    if not advice_service.cancel(advice_id):
+        return jsonify({'error': 'Advice not found'}), 404
+    return jsonify({"status": "success"})
+
+
 # ============================================
 # 기존 API 엔드포인트들
 # ============================================
 
+def _parse_time_arg(name):
+    """쿼리 파라미터 시각 (epoch 초 또는 ISO 날짜/시각) → epoch 초"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp())
+
+
 @app.route('/history', methods=['GET'])
 def get_analysis_history():
+    """
+    분석 기록 조회 (최신순)
+    - ?limit=&cursor= : 키셋 페이지네이션 (응답의 next_cursor 로 다음 페이지)
+    - ?min_score=&max_score=&from=&to=&image= : 필터 (image 는 파일명 접두사)
+    - ?format=ndjson : 조건에 맞는 전체 기록을 한 줄씩 스트리밍
+    """
     try:
-        limit = request.args.get('limit', 10, type=int)
-        limit = min(limit, 50)
-        history = get_history(limit)
+        filters = {
+            'min_score': request.args.get('min_score', type=int),
+            'max_score': request.args.get('max_score', type=int),
+            'start': _parse_time_arg('from'),
+            'end': _parse_time_arg('to'),
+            'image_prefix': request.args.get('image')
+        }
+    except ValueError:
+        return jsonify({'error': 'Invalid from/to'}), 400
+
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            for row in iter_history(**filters):
+                yield json.dumps(row, ensure_ascii=False) + '\n'
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Content-Disposition': 'attachment; filename=history.ndjson'}
+        )
+
+    limit = max(1, min(request.args.get('limit', 10, type=int), HISTORY_MAX_PAGE))
+    try:
+        history, next_cursor = get_history_page(limit, request.args.get('cursor'), **filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        "status": "success",
+        "count": len(history),
+        "history": history,
+        "next_cursor": next_cursor
+    })
+
+
+@app.route('/history/trend', methods=['GET'])
+def get_score_trend():
+    """점수 추이 (?from=&to=&bucket=day|week)"""
+    try:
+        start, end = _parse_time_arg('from'), _parse_time_arg('to')
+    except ValueError:
+        return jsonify({'error': 'Invalid from/to'}), 400
+
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in ('day', 'week'):
+        return jsonify({'error': 'Invalid bucket'}), 400
+
+    try:
+        trend = get_trend(bucket, start, end)
         return jsonify({
             "status": "success",
-            "count": len(history),
-            "history": history
+            "bucket": bucket,
+            "trend": trend
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -262,18 +667,55 @@ def get_stats():
         stats = get_statistics()
         return jsonify({
             "status": "success",
-            "statistics": stats
+            "statistics": stats,
+            "writer": history_writer.metrics() if history_writer else None
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/statistics/objects', methods=['GET'])
+def get_object_stats():
+    """물체 종류 / 위치별 출현 빈도 (?name=&location=&since=epoch초)"""
+    try:
+        frequency = get_object_frequency(
+            name=request.args.get('name'),
+            location=request.args.get('location'),
+            since=request.args.get('since', type=int)
+        )
+        return jsonify({
+            "status": "success",
+            "frequency": frequency
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/render/metrics', methods=['GET'])
+def get_render_metrics():
+    """백그라운드 렌더링 풀 지표"""
+    return jsonify({
+        "status": "success",
+        "render_mode": RENDER_MODE,
+        "metrics": render_pool.metrics(),
+        "storage": {
+            "uploads": upload_store.stats(),
+            "results": result_store.stats()
+        }
+    })
+
+
 @app.route('/tracking/reset', methods=['POST'])
 def reset_tracking():
-    """추적 정보 초기화"""
+    """추적 정보 초기화 (?room= 방별)"""
+    room = request.args.get('room', DEFAULT_ROOM)
+    error = _room_error(room)
+    if error:
+        return error
+
     try:
-        tracker = get_tracker()
-        tracker.reset()
+        with tracker_session(room) as tracker:
+            tracker.reset()
         return jsonify({
             "status": "success",
             "message": "추적 정보가 초기화되었습니다."
@@ -284,14 +726,21 @@ def reset_tracking():
 
 @app.route('/tracking/stats', methods=['GET'])
 def get_tracking_stats():
-    """추적 통계 조회"""
+    """추적 통계 조회 (?room= 방별)"""
+    room = request.args.get('room', DEFAULT_ROOM)
+    error = _room_error(room)
+    if error:
+        return error
+
     try:
-        tracker = get_tracker()
-        stats = tracker.get_statistics()
-        problems = tracker.get_problem_objects()
+        with tracker_session(room) as tracker:
+            stats = tracker.get_statistics()
+            problems = tracker.get_problem_objects()
         
         return jsonify({
             "status": "success",
+            "room": room,
+            "shards": get_tracker_registry().stats(),
             "statistics": stats,
             "chronic_problems": problems
         })
@@ -299,9 +748,65 @@ def get_tracking_stats():
         return jsonify({'error': str(e)}), 500
 
 
+def _set_result_cache_headers(response, immutable):
+    """결과 이미지 캐시 정책"""
+    if immutable:
+        response.headers['Cache-Control'] = f'public, max-age={RESULT_MAX_AGE}, immutable'
+    else:
+        # 현재 버전(?v=) 없이 요청된 경우: 캐시는 하되 매번 ETag 로 재검증
+        response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+
 @app.route('/results/<path:filename>')
 def serve_result_image(filename):
-    return send_from_directory(RESULT_FOLDER, filename)
+    """
+    결과 이미지 제공 (처음 요청된 뷰는 렌더링 후 캐시)
+    
+    Query:
+        w: 원하는 너비 (설정된 썸네일 중 이보다 크거나 같은 가장 작은 것)
+        v: 렌더링 설정 지문 + 분석 상태 해시 (현재 값과 같으면 immutable 캐시)
+    
+    ETag/If-None-Match(304), Range 요청을 지원한다.
+    """
+    width = request.args.get('w', type=int)
+    etag = result_views.etag(filename, width)
+    if etag is None:
+        return jsonify({'error': 'Result not found'}), 404
+
+    immutable = request.args.get('v') == result_views.version(parse_view_filename(filename)[1])
+
+    # 재요청은 디스크를 읽거나 렌더링을 기다리지 않고 바로 304
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return _set_result_cache_headers(response, immutable)
+
+    # 백그라운드 렌더링 중이면 잠시 기다리고, 그래도 안 끝나면 202
+    if not render_pool.wait(filename, timeout=RENDER_WAIT_SECONDS):
+        response = jsonify({'status': 'pending', 'message': 'Result is still rendering'})
+        response.headers['Retry-After'] = '1'
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 202
+
+    try:
+        path = result_views.get(filename, width=width)
+    except Exception as e:
+        print(f"⚠️ 결과 뷰 렌더링 실패: {e}")
+        return jsonify({'error': f'Rendering failed: {str(e)}'}), 500
+
+    if path is None:
+        return jsonify({'error': 'Result not found'}), 404
+
+    # conditional=True: If-None-Match → 304, Range → 206 처리
+    response = send_from_directory(
+        RESULT_FOLDER,
+        os.path.basename(path),
+        mimetype=result_encoder.mimetype,
+        etag=etag,
+        conditional=True
+    )
+    return _set_result_cache_headers(response, immutable)
 
 
 # ============================================
@@ -315,4 +820,4 @@ if __name__ == "__main__":
     print("✅ 객체 추적 (반복 문제 탐지)")
     print("✅ 쌓임/포개짐 자동 감지")
     print("="*50)
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    create_app().run(debug=True, host="0.0.0.0", port=5000)
@@ -1,18 +1,151 @@
 # backend/db.py
 # 분석 기록 데이터베이스 관리
+# - 스레드마다 연결 하나를 사용하고, 요청/스레드가 끝나면 작은 풀로 반환해 재사용
+#   (요청마다 새로 열지 않고, 끝난 스레드의 연결을 계속 붙잡지도 않음)
+# - WAL 모드: 읽기와 쓰기가 서로를 막지 않음
 
+import base64
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import weakref
+from datetime import datetime, timedelta
 import json
 
 DB_PATH = 'analysis_history.db'
 
-def init_db():
-    """데이터베이스 초기화"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    c.execute('''
+# 연결 설정
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=134217728',  # 128MB
+    'PRAGMA cache_size=-16000',  # 16MB
+)
+CACHED_STATEMENTS = 64  # 연결별 준비된 쿼리 캐시 크기
+
+POOL_SIZE = 8  # 스레드가 반환한 연결을 재사용하려고 보관하는 최대 수
+
+_local = threading.local()
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)  # 쉬고 있는 연결 (최근 반환된 것부터)
+_connections = set()  # 열려 있는 모든 연결 (사용 중 + 풀, 종료 시 정리)
+_connections_lock = threading.Lock()
+
+
+def _connect():
+    # 다른 스레드에서 반환/종료할 수 있도록 check_same_thread=False
+    conn = sqlite3.connect(DB_PATH, cached_statements=CACHED_STATEMENTS, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+
+    with _connections_lock:
+        _connections.add(conn)
+    return conn
+
+
+def _discard(conn):
+    with _connections_lock:
+        _connections.discard(conn)
+    try:
+        conn.close()
+    except Exception as e:
+        print(f"⚠️ DB 연결 종료 실패: {e}")
+
+
+def _return_to_pool(conn):
+    """연결을 풀로 반환 (풀이 가득 찼거나 close_all() 이후면 닫음)"""
+    with _connections_lock:
+        alive = conn in _connections
+    if not alive:
+        return
+
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        _pool.put_nowait(conn)
+    except (queue.Full, sqlite3.Error):
+        _discard(conn)
+
+
+class _ThreadConnection:
+    """
+    스레드 로컬에 두는 연결 보관함
+
+    release_connection() 으로 반환하지 않고 스레드가 끝나도
+    스레드 로컬과 함께 버려질 때 연결이 풀로 돌아간다 (끝난 스레드의 연결을 붙잡지 않음).
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._finalizer = weakref.finalize(self, _return_to_pool, conn)
+
+    def release(self):
+        self._finalizer()
+
+    def detach(self):
+        self._finalizer.detach()
+
+
+def get_connection():
+    """현재 스레드의 DB 연결 (없으면 풀에서 가져오거나 새로 생성)"""
+    holder = getattr(_local, 'holder', None)
+    if holder is not None:
+        return holder.conn
+
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+
+    _local.holder = _ThreadConnection(conn)
+    return conn
+
+
+def release_connection():
+    """현재 스레드의 연결을 풀로 반환 (요청 종료 시)"""
+    holder = _local.__dict__.pop('holder', None)
+    if holder is not None:
+        holder.release()
+
+
+def close_all():
+    """모든 스레드의 연결 닫기 (종료 시)"""
+    holder = _local.__dict__.pop('holder', None)
+    if holder is not None:
+        holder.detach()
+
+    with _connections_lock:
+        connections = list(_connections)
+        _connections.clear()
+
+    while True:
+        try:
+            _pool.get_nowait()
+        except queue.Empty:
+            break
+
+    for conn in connections:
+        try:
+            conn.close()
+        except Exception as e:
+            print(f"⚠️ DB 연결 종료 실패: {e}")
+
+
+# ============================================
+# 스키마 마이그레이션 (PRAGMA user_version = 적용된 마이그레이션 수)
+# ============================================
+def _to_epoch(timestamp):
+    """ISO 시각 문자열 → epoch 초 (저장 시각과 같은 로컬 기준)"""
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+def _migration_create_analyses(conn):
+    """1: analyses 테이블"""
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS analyses (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
@@ -24,56 +157,466 @@ def init_db():
             suggestions TEXT
         )
     ''')
+
+def _migration_epoch_column(conn):
+    """2: 정수 epoch 시각 컬럼 (기존 행은 timestamp 로 채움)"""
+    conn.execute('ALTER TABLE analyses ADD COLUMN ts_epoch INTEGER NOT NULL DEFAULT 0')
+    conn.create_function('to_epoch', 1, _to_epoch, deterministic=True)
+    conn.execute('UPDATE analyses SET ts_epoch = to_epoch(timestamp)')
+
+def _migration_indexes(conn):
+    """3: 시각 / 이미지 이름 / 점수 인덱스"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_ts ON analyses(ts_epoch, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_image ON analyses(image_name)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(score)')
+
+def _migration_aggregates(conn):
+    """4: 누적 통계 / 일별 점수 롤업 테이블"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_aggregates (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            count INTEGER NOT NULL,
+            score_sum INTEGER NOT NULL,
+            score_max INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS score_rollups (
+            bucket TEXT NOT NULL,
+            period_start INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            score_sum INTEGER NOT NULL,
+            score_min INTEGER NOT NULL,
+            score_max INTEGER NOT NULL,
+            PRIMARY KEY (bucket, period_start)
+        )
+    ''')
+    # 기존 행 집계 (이 시점 스키마 기준으로 고정, 이후 변경은 새 마이그레이션에서)
+    conn.create_function('day_start', 1, _day_start, deterministic=True)
+    conn.execute('DELETE FROM analysis_aggregates')
+    conn.execute('DELETE FROM score_rollups')
+    conn.execute('''
+        INSERT INTO analysis_aggregates (id, count, score_sum, score_max)
+        SELECT 1, COUNT(*), COALESCE(SUM(score), 0), MAX(score) FROM analyses
+    ''')
+    conn.execute('''
+        INSERT INTO score_rollups (bucket, period_start, count, score_sum, score_min, score_max)
+        SELECT 'day', day_start(ts_epoch), COUNT(*), SUM(score), MIN(score), MAX(score)
+        FROM analyses
+        GROUP BY day_start(ts_epoch)
+    ''')
+
+def _migration_detections(conn):
+    """5: 탐지 결과 정규화 테이블 (기존 JSON 은 옮겨 담음)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS detections (
+            id INTEGER PRIMARY KEY,
+            analysis_id INTEGER NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+            class_id INTEGER,
+            name TEXT NOT NULL,
+            conf REAL NOT NULL,
+            x1 INTEGER NOT NULL,
+            y1 INTEGER NOT NULL,
+            x2 INTEGER NOT NULL,
+            y2 INTEGER NOT NULL,
+            location TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_detections_analysis ON detections(analysis_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_detections_name_location ON detections(name, location)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_detections_location ON detections(location)')
     
-    conn.commit()
-    conn.close()
-    print("✅ 데이터베이스 초기화 완료")
+    # 전부 옮긴 행만 JSON 을 비움 (하나라도 못 옮기면 원본을 그대로 남김)
+    kept = 0
+    rows = conn.execute('SELECT id, detections FROM analyses WHERE detections IS NOT NULL')
+    for analysis_id, blob in rows.fetchall():
+        try:
+            detections = json.loads(blob)
+        except ValueError:
+            detections = None
+        if not isinstance(detections, list):
+            kept += 1
+            continue
+        
+        valid = [d for d in detections if _is_valid_detection(d)]
+        _insert_detections(conn, analysis_id, valid)
+        if len(valid) == len(detections):
+            conn.execute('UPDATE analyses SET detections = NULL WHERE id = ?', (analysis_id,))
+        else:
+            kept += 1
+    if kept:
+        print(f"⚠️ 탐지 결과를 모두 옮기지 못한 {kept}개 행은 원본 JSON 을 남겨 둠 (analyses.detections)")
 
-def save_analysis(score, detections, report, image_name):
-    """분석 결과 저장"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def _is_valid_detection(d):
+    """detections 테이블로 옮길 수 있는 탐지 결과인지"""
+    if not isinstance(d, dict) or not isinstance(d.get('name'), str):
+        return False
+    bbox = d.get('bbox')
+    if not isinstance(bbox, (list, tuple)) or len(bbox) != 4:
+        return False
+    numbers = [*bbox, d.get('conf', 0)]
+    return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in numbers)
+
+def _migration_rollup_columns(conn):
+    """6: 롤업에 물체 수 / 바닥 물건 수 추가 + 주별 롤업 (전체 재계산)"""
+    conn.execute('ALTER TABLE score_rollups ADD COLUMN objects_sum INTEGER NOT NULL DEFAULT 0')
+    conn.execute('ALTER TABLE score_rollups ADD COLUMN floor_items_sum INTEGER NOT NULL DEFAULT 0')
+    _rebuild_aggregates(conn)
+
+def _migration_archives(conn):
+    """7: 보관(아카이브) 기록 / 메타 테이블"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archives (
+            file TEXT PRIMARY KEY,
+            month TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            first_ts INTEGER NOT NULL,
+            last_ts INTEGER NOT NULL,
+            score_sum INTEGER NOT NULL,
+            score_max INTEGER NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS db_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+
+# 순서대로 한 번씩만 적용 (기존 항목은 수정하지 말고 뒤에 추가)
+MIGRATIONS = [
+    _migration_create_analyses,
+    _migration_epoch_column,
+    _migration_indexes,
+    _migration_aggregates,
+    _migration_detections,
+    _migration_rollup_columns,
+    _migration_archives,
+]
+
+def migrate(conn):
+    """
+    적용되지 않은 마이그레이션을 하나씩 트랜잭션으로 적용
+    
+    Returns:
+        int: 현재 스키마 버전
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        print(f"✅ DB 마이그레이션 적용: {migration.__doc__}")
     
+    return len(MIGRATIONS)
+
+# ============================================
+# 누적 통계 (save_analysis 트랜잭션에서 함께 갱신)
+# ============================================
+def _day_start(ts_epoch):
+    """epoch 초 → 그날 0시(로컬)의 epoch 초"""
+    day = datetime.fromtimestamp(ts_epoch).date()
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+def _week_start(ts_epoch):
+    """epoch 초 → 그 주 월요일 0시(로컬)의 epoch 초"""
+    day = datetime.fromtimestamp(ts_epoch).date()
+    monday = day - timedelta(days=day.weekday())
+    return int(datetime(monday.year, monday.month, monday.day).timestamp())
+
+# 롤업 단위 → 구간 시작 계산 함수
+ROLLUP_BUCKETS = {
+    'day': _day_start,
+    'week': _week_start,
+}
+
+def _update_aggregates(conn, ts_epoch, score, total_objects, floor_items):
+    """분석 1건을 누적 통계와 일별/주별 롤업에 반영"""
+    conn.execute('''
+        INSERT INTO analysis_aggregates (id, count, score_sum, score_max) VALUES (1, 1, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            count = count + 1,
+            score_sum = score_sum + excluded.score_sum,
+            score_max = MAX(COALESCE(score_max, excluded.score_max), excluded.score_max)
+    ''', (score, score))
+    conn.executemany('''
+        INSERT INTO score_rollups (
+            bucket, period_start, count, score_sum, score_min, score_max,
+            objects_sum, floor_items_sum
+        )
+        VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+        ON CONFLICT(bucket, period_start) DO UPDATE SET
+            count = count + 1,
+            score_sum = score_sum + excluded.score_sum,
+            score_min = MIN(score_min, excluded.score_min),
+            score_max = MAX(score_max, excluded.score_max),
+            objects_sum = objects_sum + excluded.objects_sum,
+            floor_items_sum = floor_items_sum + excluded.floor_items_sum
+    ''', [
+        (bucket, period_start(ts_epoch), score, score, score, total_objects, floor_items)
+        for bucket, period_start in ROLLUP_BUCKETS.items()
+    ])
+
+def _has_table(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+def get_meta(conn, key, default=None):
+    if not _has_table(conn, 'db_meta'):
+        return default
+    row = conn.execute('SELECT value FROM db_meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+def set_meta(conn, key, value):
+    conn.execute('INSERT OR REPLACE INTO db_meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+def archive_watermark(conn):
+    """이 시각(epoch 초) 이전 기록은 보관 파일로 옮겨짐 (항상 주 시작 시각)"""
+    return int(get_meta(conn, 'archive_watermark', 0))
+
+def _rebuild_aggregates(conn):
+    """
+    트랜잭션 안에서 호출: 누적 통계와 롤업 재계산
+    
+    보관된 기간의 롤업은 원본 행이 없으므로 그대로 두고,
+    누적 통계에는 보관 파일의 합계를 더한다.
+    """
+    watermark = archive_watermark(conn)
+    
+    count, score_sum, score_max = conn.execute(
+        'SELECT COUNT(*), COALESCE(SUM(score), 0), MAX(score) FROM analyses'
+    ).fetchone()
+    if _has_table(conn, 'archives'):
+        archived = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(rows), 0), COALESCE(SUM(score_sum), 0), MAX(score_max) FROM archives'
+        ).fetchone()
+        if archived[0]:
+            count += archived[1]
+            score_sum += archived[2]
+            score_max = archived[3] if score_max is None else max(score_max, archived[3])
+    
+    conn.execute('DELETE FROM analysis_aggregates')
+    conn.execute(
+        'INSERT INTO analysis_aggregates (id, count, score_sum, score_max) VALUES (1, ?, ?, ?)',
+        (count, score_sum, score_max)
+    )
+    
+    conn.execute('DELETE FROM score_rollups WHERE period_start >= ?', (watermark,))
+    for bucket, period_start in ROLLUP_BUCKETS.items():
+        conn.create_function('period_start', 1, period_start, deterministic=True)
+        conn.execute('''
+            INSERT INTO score_rollups (
+                bucket, period_start, count, score_sum, score_min, score_max,
+                objects_sum, floor_items_sum
+            )
+            SELECT ?, period_start(ts_epoch), COUNT(*), SUM(score), MIN(score), MAX(score),
+                   SUM(total_objects), SUM(floor_items)
+            FROM analyses
+            WHERE ts_epoch >= ?
+            GROUP BY period_start(ts_epoch)
+        ''', (bucket, watermark))
+
+def rebuild_aggregates():
+    """누적 통계를 처음부터 다시 계산 (python db.py rebuild-aggregates)"""
+    conn = get_connection()
+    with conn:
+        _rebuild_aggregates(conn)
+    count = conn.execute('SELECT count FROM analysis_aggregates WHERE id = 1').fetchone()[0]
+    print(f"✅ 누적 통계 재계산 완료: {count}건")
+
+def _insert_detections(conn, analysis_id, detections):
+    """탐지 결과를 detections 테이블에 일괄 저장"""
+    conn.executemany('''
+        INSERT INTO detections (analysis_id, class_id, name, conf, x1, y1, x2, y2, location)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (analysis_id, d.get('class_id'), d['name'], d.get('conf', 0), *map(int, d['bbox']), d.get('location'))
+        for d in detections
+    ])
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+def _auto_vacuum_mode(conn):
+    return conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+
+def enable_incremental_vacuum():
+    """
+    기존 DB 를 auto_vacuum=INCREMENTAL 로 전환 (python db.py enable-incremental-vacuum)
+    
+    전체 VACUUM 이 필요해 DB 크기만큼 쓰기 잠금을 잡으므로 앱 시작 시에는 하지 않는다.
+    """
+    conn = get_connection()
+    if _auto_vacuum_mode(conn) == AUTO_VACUUM_INCREMENTAL:
+        print("✅ 이미 증분 VACUUM 모드")
+        return
+    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    conn.execute('VACUUM')
+    print("✅ DB 증분 VACUUM 모드 설정")
+
+def incremental_vacuum(pages_per_step=1000):
+    """
+    빈 페이지를 조금씩 반환 (긴 잠금 없이)
+    
+    Returns:
+        int: 반환한 페이지 수
+    """
+    conn = get_connection()
+    # 증분 모드가 아니면 incremental_vacuum 은 아무것도 반환하지 않음
+    if _auto_vacuum_mode(conn) != AUTO_VACUUM_INCREMENTAL:
+        return 0
+    freed = 0
+    while True:
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if free_pages == 0:
+            return freed
+        step = min(free_pages, pages_per_step)
+        conn.execute(f'PRAGMA incremental_vacuum({step})').fetchall()
+        freed += step
+
+def init_db():
+    """데이터베이스 초기화 (스키마 마이그레이션)"""
+    conn = get_connection()
+    # 새(빈) DB 는 바로 증분 VACUUM 모드로 (비어 있으므로 VACUUM 이 즉시 끝남)
+    if not _has_table(conn, 'analyses'):
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+    version = migrate(conn)
+    if _auto_vacuum_mode(conn) != AUTO_VACUUM_INCREMENTAL:
+        print("⚠️ 증분 VACUUM 모드가 아님: 보관 후 빈 페이지가 반환되지 않음 "
+              "(python db.py enable-incremental-vacuum 으로 한 번 전환)")
+    print(f"✅ 데이터베이스 초기화 완료 (스키마 v{version})")
+
+def _insert_analysis(conn, score, detections, report, image_name, timestamp=None):
+    """트랜잭션 안에서 호출: 분석 1건 + 탐지 결과 + 누적 통계"""
     # 바닥 물건 개수
     max_y = max(obj['bbox'][3] for obj in detections) if detections else 1000
     floor_items = sum(1 for d in detections if d['bbox'][3] > max_y * 0.8)
     
-    c.execute('''
+    now = timestamp or datetime.now()
+    
+    c = conn.execute('''
         INSERT INTO analyses (
-            timestamp, score, total_objects, floor_items, 
+            timestamp, ts_epoch, score, total_objects, floor_items, 
             image_name, detections, suggestions
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     ''', (
-        datetime.now().isoformat(),
+        now.isoformat(),
+        int(now.timestamp()),
         score,
         len(detections),
         floor_items,
         image_name,
-        json.dumps(detections),
+        None,  # 탐지 결과는 detections 테이블에
         json.dumps(report.get('suggestions', []))
     ))
+    _insert_detections(conn, c.lastrowid, detections)
+    _update_aggregates(conn, int(now.timestamp()), score, len(detections), floor_items)
+    return c.lastrowid
+
+def save_analyses(records):
+    """
+    분석 결과 여러 건을 한 트랜잭션으로 저장
     
-    conn.commit()
-    analysis_id = c.lastrowid
-    conn.close()
+    Args:
+        records: [{score, detections, report, image_name, timestamp}]
     
-    return analysis_id
+    Returns:
+        list: 저장된 분석 id 목록
+    """
+    conn = get_connection()
+    with conn:
+        return [_insert_analysis(conn, **record) for record in records]
 
-def get_history(limit=10):
-    """전체 기록 조회"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def save_analysis(score, detections, report, image_name, timestamp=None):
+    """분석 결과 저장"""
+    return save_analyses([{
+        'score': score,
+        'detections': detections,
+        'report': report,
+        'image_name': image_name,
+        'timestamp': timestamp
+    }])[0]
+
+def encode_cursor(ts_epoch, analysis_id):
+    """페이지 커서 (클라이언트에는 불투명한 문자열)"""
+    raw = json.dumps([ts_epoch, analysis_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    페이지 커서 → (ts_epoch, id)
+    
+    Raises:
+        ValueError: 올바르지 않은 커서
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ts_epoch, analysis_id = json.loads(raw)
+        return int(ts_epoch), int(analysis_id)
+    except Exception:
+        raise ValueError(f"올바르지 않은 커서: {cursor}")
+
+def _history_filters(min_score=None, max_score=None, start=None, end=None, image_prefix=None):
+    """기록 필터 → (WHERE 조건 목록, 파라미터 목록)"""
+    where, params = [], []
+    if min_score is not None:
+        where.append('score >= ?')
+        params.append(min_score)
+    if max_score is not None:
+        where.append('score <= ?')
+        params.append(max_score)
+    if start is not None:
+        where.append('ts_epoch >= ?')
+        params.append(start)
+    if end is not None:
+        where.append('ts_epoch <= ?')
+        params.append(end)
+    if image_prefix:
+        # LIKE 대신 범위 비교 → image_name 인덱스 사용
+        where.append('image_name >= ? AND image_name < ?')
+        params.extend([image_prefix, image_prefix + '\U0010ffff'])
+    return where, params
+
+def get_history_page(limit=10, cursor=None, **filters):
+    """
+    기록 한 페이지 조회 (최신순, (ts_epoch, id) 키셋 페이지네이션)
+    
+    Args:
+        limit: 페이지 크기
+        cursor: 이전 페이지의 next_cursor (None 이면 처음부터)
+        **filters: min_score, max_score, start, end (epoch 초), image_prefix
+    
+    Returns:
+        tuple: (기록 목록, 다음 페이지 커서 또는 None)
+    """
+    where, params = _history_filters(**filters)
+    if cursor:
+        ts_epoch, analysis_id = decode_cursor(cursor)
+        where.append('(ts_epoch, id) < (?, ?)')
+        params.extend([ts_epoch, analysis_id])
     
-    c.execute('''
-        SELECT id, timestamp, score, total_objects, floor_items, image_name
+    rows = get_connection().execute(f'''
+        SELECT id, timestamp, score, total_objects, floor_items, image_name, ts_epoch
         FROM analyses
-        ORDER BY timestamp DESC
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        ORDER BY ts_epoch DESC, id DESC
         LIMIT ?
-    ''', (limit,))
+    ''', (*params, limit + 1)).fetchall()
     
-    rows = c.fetchall()
-    conn.close()
+    # 한 행 더 읽어서 다음 페이지가 있는지 확인
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][6], rows[-1][0])
     
     return [{
         'id': r[0],
@@ -82,29 +625,151 @@ def get_history(limit=10):
         'total_objects': r[3],
         'floor_items': r[4],
         'image_name': r[5]
-    } for r in rows]
+    } for r in rows], next_cursor
+
+def iter_history(batch_size=500, **filters):
+    """
+    조건에 맞는 기록 전체를 최신순으로 하나씩 (내보내기용)
+    
+    페이지 단위로 읽으므로 전체를 메모리에 올리지 않고,
+    읽기 트랜잭션을 길게 잡고 있지도 않는다.
+    """
+    cursor = None
+    while True:
+        rows, cursor = get_history_page(batch_size, cursor, **filters)
+        yield from rows
+        if cursor is None:
+            return
+
+def get_history(limit=10):
+    """전체 기록 조회 (최신 limit 개)"""
+    return get_history_page(limit)[0]
 
 def get_statistics():
-    """통계 조회"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    """통계 조회 (누적 통계 한 행)"""
+    row = get_connection().execute(
+        'SELECT count, score_sum, score_max FROM analysis_aggregates WHERE id = 1'
+    ).fetchone()
+    total_count, score_sum, max_score = row or (0, 0, None)
     
-    # 전체 분석 횟수
-    c.execute('SELECT COUNT(*) FROM analyses')
-    total_count = c.fetchone()[0]
+    return {
+        'total_analyses': total_count,
+        'average_score': round(score_sum / total_count, 1) if total_count else 0,
+        'max_score': max_score or 0
+    }
+
+def get_object_frequency(name=None, location=None, since=None):
+    """
+    물체 종류 / 위치별 출현 빈도
     
-    # 평균 점수
-    c.execute('SELECT AVG(score) FROM analyses')
-    avg_score = c.fetchone()[0] or 0
+    Args:
+        name: 물체 종류 (None 이면 전체)
+        location: 위치 (None 이면 전체)
+        since: 이 시각(epoch 초) 이후 분석만
     
-    # 최고 점수
-    c.execute('SELECT MAX(score) FROM analyses')
-    max_score = c.fetchone()[0] or 0
+    Returns:
+        list: [{name, location, detections, analyses, ratio}] 출현 횟수 내림차순
+        (ratio = 해당 물체가 나온 분석 수 / 기간 내 전체 분석 수)
+    """
+    conn = get_connection()
+    where, params = [], []
+    if name:
+        where.append('d.name = ?')
+        params.append(name)
+    if location:
+        where.append('d.location = ?')
+        params.append(location)
+    if since:
+        where.append('a.ts_epoch >= ?')
+        params.append(since)
     
-    conn.close()
+    rows = conn.execute(f'''
+        SELECT d.name, d.location, COUNT(*), COUNT(DISTINCT d.analysis_id)
+        FROM detections d JOIN analyses a ON a.id = d.analysis_id
+        {'WHERE ' + ' AND '.join(where) if where else ''}
+        GROUP BY d.name, d.location
+        ORDER BY COUNT(*) DESC
+    ''', params).fetchall()
     
-    return {
-        'total_analyses': total_count,
-        'average_score': round(avg_score, 1),
-        'max_score': max_score
-    }
\ No newline at end of file
+    total = conn.execute(
+        'SELECT COUNT(*) FROM analyses WHERE ts_epoch >= ?', (since or 0,)
+    ).fetchone()[0]
+    
+    return [{
+        'name': r[0],
+        'location': r[1],
+        'detections': r[2],
+        'analyses': r[3],
+        'ratio': round(r[3] / total, 3) if total else 0
+    } for r in rows]
+
+def get_trend(bucket='day', start=None, end=None):
+    """
+    기간별 점수 추이 (롤업 테이블에서 조회)
+    
+    Args:
+        bucket: 'day' 또는 'week'
+        start: 시작 시각 (epoch 초, 이 시각이 속한 구간부터)
+        end: 끝 시각 (epoch 초, 포함)
+    
+    Returns:
+        list: [{period_start, period, count, avg_score, min_score, max_score,
+                avg_objects, avg_floor_items}] 시간순
+    """
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"지원하지 않는 구간 단위: {bucket}")
+    
+    start = ROLLUP_BUCKETS[bucket](start) if start is not None else 0
+    end = end if end is not None else 2 ** 62
+    
+    rows = get_connection().execute('''
+        SELECT period_start, count, score_sum, score_min, score_max, objects_sum, floor_items_sum
+        FROM score_rollups
+        WHERE bucket = ? AND period_start BETWEEN ? AND ?
+        ORDER BY period_start
+    ''', (bucket, start, end)).fetchall()
+    
+    return [{
+        'period_start': r[0],
+        'period': datetime.fromtimestamp(r[0]).date().isoformat(),
+        'count': r[1],
+        'avg_score': round(r[2] / r[1], 1),
+        'min_score': r[3],
+        'max_score': r[4],
+        'avg_objects': round(r[5] / r[1], 1),
+        'avg_floor_items': round(r[6] / r[1], 1)
+    } for r in rows]
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='분석 기록 DB 관리')
+    parser.add_argument('command', choices=['migrate', 'rebuild-aggregates', 'enable-incremental-vacuum', 'archive', 'export'])
+    parser.add_argument('--retention-days', type=int, default=90, help='archive: 보관할 기간 (일)')
+    parser.add_argument('--archive-dir', default='archive', help='archive/export: 보관 파일 위치')
+    parser.add_argument('--from', dest='start', help='export: 시작 날짜 (ISO)')
+    parser.add_argument('--to', dest='end', help='export: 끝 날짜 (ISO)')
+    parser.add_argument('--output', help='export: 출력 파일 (기본 표준 출력)')
+    args = parser.parse_args()
+    
+    init_db()
+    if args.command == 'rebuild-aggregates':
+        rebuild_aggregates()
+    elif args.command == 'enable-incremental-vacuum':
+        enable_incremental_vacuum()
+    elif args.command == 'archive':
+        from utils.history_archive import archive_old_analyses
+        archive_old_analyses(args.retention_days, args.archive_dir)
+    elif args.command == 'export':
+        import sys
+        from utils.history_archive import export_history
+        start = _to_epoch(args.start) if args.start else None
+        end = _to_epoch(args.end) if args.end else None
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            export_history(out, args.archive_dir, start, end)
+        finally:
+            if args.output:
+                out.close()
+    close_all()
@@ -0,0 +1,109 @@
+# backend/stub_llm_server.py
+"""
+오프라인 테스트용 OpenAI 호환 스텁 서버
+
+/v1/chat/completions 만 흉내 낸다 (stream=true 면 SSE 청크로 한 단어씩).
+실제 모델 호출 없이 조언 스트리밍, 시간 제한, 취소를 확인할 때 사용.
+
+사용법:
+    python stub_llm_server.py [--port 8001] [--delay 0.05] [--words 60]
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub python app.py
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_ADVICE = (
+    "방 전체적으로 바닥에 물건이 많아 동선이 막혀 있습니다. "
+    "우선순위 1) 바닥의 가방과 옷 정리 2) 책상 위 컵과 병 치우기 3) 침대 위 물건 제자리로. "
+    "책과 문구류는 책상 서랍에, 옷은 옷장에, 가방은 문 옆 고리에 걸어 두세요. "
+    "매일 자기 전 5분 동안 바닥과 책상 위를 비우는 루틴을 추천합니다."
+)
+
+
+def make_handler(delay, words):
+    tokens = (SAMPLE_ADVICE.split(' ') * (words // len(SAMPLE_ADVICE.split(' ')) + 1))[:words]
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self.send_error(404)
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            model = body.get('model', 'stub')
+            created = int(time.time())
+
+            if not body.get('stream'):
+                payload = {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion',
+                    'created': created,
+                    'model': model,
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': ' '.join(tokens)},
+                        'finish_reason': 'stop'
+                    }],
+                    'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)}
+                }
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+
+            def chunk(delta, finish_reason=None):
+                payload = {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion.chunk',
+                    'created': created,
+                    'model': model,
+                    'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+                }
+                self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+
+            try:
+                chunk({'role': 'assistant', 'content': ''})
+                for i, token in enumerate(tokens):
+                    time.sleep(delay)
+                    chunk({'content': token if i == 0 else ' ' + token})
+                chunk({}, 'stop')
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # 클라이언트가 취소해 연결을 끊음
+                pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.05, help='토큰 사이 지연 (초)')
+    parser.add_argument('--words', type=int, default=60, help='응답 단어 수')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.delay, args.words))
+    print(f"✅ 스텁 LLM 서버: http://127.0.0.1:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+# backend/tests/conftest.py
+"""
+테스트 공통 설정
+- backend 디렉터리를 import 경로에 추가 (utils.*, db 등을 앱과 같은 방식으로 import)
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
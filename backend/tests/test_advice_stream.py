@@ -0,0 +1,148 @@
+# backend/tests/test_advice_stream.py
+"""
+조언 스트리밍 테스트 (stub_llm_server.py 사용, 실제 모델 호출 없음)
+- SSE token 이벤트 뒤에 done 이벤트
+- 늦게 연결한 구독자도 처음부터 다시 받음
+- 생성 중 취소
+- ADVICE_TIMEOUT 감시 타이머
+"""
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('openai')
+
+from openai import OpenAI
+
+from stub_llm_server import make_handler
+from utils.advice import AdviceService
+
+DETECTIONS = [{'name': 'cup', 'location': 'floor'}, {'name': 'book', 'location': 'desk'}]
+
+
+@pytest.fixture
+def stub_client():
+    """stub_llm_server 를 띄우고 그 서버를 쓰는 OpenAI 클라이언트를 만드는 함수"""
+    servers = []
+
+    def start(delay=0.0, words=20):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(delay, words))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return OpenAI(api_key='stub', base_url=f'http://127.0.0.1:{server.server_port}/v1', max_retries=0)
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def services():
+    created = []
+
+    def create(client, **kw):
+        service = AdviceService(client, **kw)
+        created.append(service)
+        return service
+
+    yield create
+
+    for service in created:
+        service.shutdown()
+
+
+def _events(service, advice_id):
+    """SSE 스트림 → [(event, data)] (연결 유지 주석은 제외)"""
+    events = []
+    for message in service.stream(advice_id, keepalive=0.5):
+        if message.startswith(':'):
+            continue
+        lines = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def _wait_done(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.done
+
+
+def test_tokens_then_done(stub_client, services):
+    service = services(stub_client(words=20))
+    advice_id = service.start(DETECTIONS, 55, suffix='\n[반복 문제]')
+
+    events = _events(service, advice_id)
+    names = [name for name, _ in events]
+    assert names[-1] == 'done' and set(names[:-1]) == {'token'}
+    assert len(names) > 2
+
+    tokens = ''.join(data['text'] for name, data in events if name == 'token')
+    done = events[-1][1]
+    assert done['error'] is None
+    assert done['text'] == tokens
+    assert len(tokens.replace('\n[반복 문제]', '').split(' ')) == 20
+    assert tokens.endswith('\n[반복 문제]')
+
+
+def test_late_subscriber_replays_from_start(stub_client, services):
+    service = services(stub_client(delay=0.01, words=20))
+    advice_id = service.start(DETECTIONS, 55)
+
+    first = _events(service, advice_id)
+    # 생성이 끝난 뒤 연결해도 같은 토큰을 처음부터
+    second = _events(service, advice_id)
+    assert second == first
+    assert first[-1][1]['error'] is None
+
+
+def test_cancel_running_job(stub_client, services):
+    service = services(stub_client(delay=0.1, words=100), timeout=30)
+    advice_id = service.start(DETECTIONS, 55, suffix='\n[반복 문제]')
+    job = service._jobs[advice_id]
+
+    # 토큰 몇 개가 도착할 때까지 (생성 중)
+    deadline = time.monotonic() + 10
+    while len(job.chunks) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not job.done
+
+    started = time.monotonic()
+    assert service.cancel(advice_id)
+    assert _wait_done(job, timeout=2)
+    assert time.monotonic() - started < 1
+
+    events = _events(service, advice_id)
+    assert events[-1] == ('done', {'text': job.text, 'error': 'cancelled'})
+    # 취소되면 고정 문구는 붙이지 않고, 이후 토큰도 쌓이지 않음
+    assert '[반복 문제]' not in job.text
+    chunks = len(job.chunks)
+    time.sleep(0.3)
+    assert len(job.chunks) == chunks < 100
+
+    assert not service.cancel('missing')
+
+
+def test_timeout_watchdog(stub_client, services):
+    # 토큰은 0.2초마다 계속 오지만 (읽기 시간 제한에는 안 걸림) 전체로는 시간 제한 초과
+    service = services(stub_client(delay=0.2, words=100), timeout=1)
+    started = time.monotonic()
+    advice_id = service.start(DETECTIONS, 55, suffix='\n[반복 문제]')
+    job = service._jobs[advice_id]
+
+    assert _wait_done(job, timeout=5)
+    assert time.monotonic() - started < 2
+
+    events = _events(service, advice_id)
+    name, done = events[-1]
+    assert name == 'done'
+    assert '1초' in done['error']
+    # 시간 제한으로 끝나도 받은 토큰과 고정 문구는 유지
+    assert done['text'].endswith('\n[반복 문제]')
+    assert len(done['text']) > len('\n[반복 문제]')
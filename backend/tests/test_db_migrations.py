@@ -0,0 +1,49 @@
+# backend/tests/test_db_migrations.py
+"""
+분석 기록 DB 마이그레이션 테스트
+- 마이그레이션 5: 탐지 결과 JSON → detections 테이블 (옮기지 못한 원본은 남김)
+"""
+import json
+import sqlite3
+
+import db
+
+
+def _conn_at_version(tmp_path, version):
+    conn = sqlite3.connect(str(tmp_path / 'history.db'))
+    with conn:
+        for migration in db.MIGRATIONS[:version]:
+            migration(conn)
+        conn.execute(f'PRAGMA user_version = {version}')
+    return conn
+
+
+def _insert(conn, detections):
+    blob = detections if isinstance(detections, str) else json.dumps(detections)
+    return conn.execute(
+        'INSERT INTO analyses (timestamp, score, total_objects, floor_items, image_name, detections, ts_epoch) '
+        "VALUES ('2024-01-01T00:00:00', 50, 1, 0, 'a.jpg', ?, 1704067200)",
+        (blob,)
+    ).lastrowid
+
+
+def test_detections_migration_keeps_json_it_could_not_copy(tmp_path):
+    conn = _conn_at_version(tmp_path, 4)
+    good = {'name': 'cup', 'conf': 0.9, 'bbox': [1, 2, 3, 4], 'location': 'floor', 'class_id': 41}
+    with conn:
+        complete = _insert(conn, [good, dict(good, name='book')])
+        partial = _insert(conn, [good, {'name': 'bag', 'bbox': [1, 2, 3]}])
+        broken = _insert(conn, '{not json')
+
+    assert db.migrate(conn) == len(db.MIGRATIONS)
+
+    blobs = dict(conn.execute('SELECT id, detections FROM analyses'))
+    assert blobs[complete] is None
+    assert json.loads(blobs[partial])[1]['name'] == 'bag'
+    assert blobs[broken] == '{not json'
+
+    names = {}
+    for analysis_id, name in conn.execute('SELECT analysis_id, name FROM detections ORDER BY id'):
+        names.setdefault(analysis_id, []).append(name)
+    assert names == {complete: ['cup', 'book'], partial: ['cup']}
+    conn.close()
@@ -0,0 +1,82 @@
+# backend/tests/test_history_archive.py
+"""
+분석 기록 보관 / 증분 VACUUM 테스트
+- 새 DB 는 시작할 때 증분 VACUUM 모드, 기존 DB 는 시작 시 VACUUM 하지 않음
+- 보관 중 다른 연결이 그 달의 기록을 모두 지워도 실패하지 않음
+"""
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import db
+from utils import history_archive
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    db.close_all()
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'history.db'))
+    yield tmp_path / 'history.db'
+    db.close_all()
+
+
+def _save(when, score=50):
+    detections = [{'name': 'cup', 'conf': 0.9, 'bbox': [0, 0, 10, 10], 'location': 'floor'}]
+    db.save_analysis(score, detections, {'suggestions': []}, 'a.jpg', timestamp=when)
+
+
+def test_new_db_uses_incremental_vacuum(history_db):
+    db.init_db()
+    assert db._auto_vacuum_mode(db.get_connection()) == db.AUTO_VACUUM_INCREMENTAL
+
+
+def test_existing_db_is_not_vacuumed_at_startup(history_db, capsys):
+    # 증분 VACUUM 모드 이전에 만들어진 DB
+    conn = sqlite3.connect(str(history_db))
+    db.migrate(conn)
+    conn.close()
+
+    db.init_db()
+    conn = db.get_connection()
+    assert db._auto_vacuum_mode(conn) != db.AUTO_VACUUM_INCREMENTAL
+    assert 'enable-incremental-vacuum' in capsys.readouterr().out
+    assert db.incremental_vacuum() == 0
+
+    # 명시적으로 전환
+    db.enable_incremental_vacuum()
+    assert db._auto_vacuum_mode(conn) == db.AUTO_VACUUM_INCREMENTAL
+
+
+def test_archive_skips_month_emptied_concurrently(history_db, tmp_path, monkeypatch):
+    db.init_db()
+    old = datetime.now() - timedelta(days=400)
+    first_month = datetime(old.year, old.month, 15)
+    second_month = first_month + timedelta(days=31)
+    _save(first_month)
+    _save(second_month)
+
+    records = history_archive._records
+    emptied = []
+
+    def records_after_concurrent_delete(conn, start, end, *args):
+        # 첫 달은 파일을 쓰기 직전에 다른 연결이 모두 지운 상황
+        if not emptied:
+            other = sqlite3.connect(db.DB_PATH)
+            with other:
+                other.execute('DELETE FROM analyses WHERE ts_epoch >= ? AND ts_epoch < ?', (start, end))
+            other.close()
+            emptied.append(start)
+        return records(conn, start, end, *args)
+
+    monkeypatch.setattr(history_archive, '_records', records_after_concurrent_delete)
+
+    archive_dir = tmp_path / 'archive'
+    assert history_archive.archive_old_analyses(90, str(archive_dir)) == 1
+
+    files = os.listdir(archive_dir)
+    assert len(files) == 1 and second_month.strftime('%Y-%m') in files[0]
+    conn = db.get_connection()
+    assert conn.execute('SELECT COUNT(*) FROM analyses').fetchone()[0] == 0
+    assert conn.execute('SELECT month FROM archives').fetchall() == [(second_month.strftime('%Y-%m'),)]
@@ -0,0 +1,185 @@
+# backend/tests/test_object_tracker.py
+"""
+SimpleObjectTracker 테스트
+- 보관 기간 검증, 같은 update() 에서 만료된 트랙의 관측 저장
+- 문제 물건 순위 (힙) 가 전체 정렬과 같은 순서인지
+- 탐지-트랙 할당 (트랙당 탐지 하나, IoU 임계값, 같은 종류끼리만)
+"""
+import random
+
+import numpy as np
+import pytest
+
+from utils.object_tracker import SimpleObjectTracker, TrackerRegistry, iou_matrix
+from utils.track_store import TrackStore
+
+
+def _tracker(tmp_path, **kw):
+    return SimpleObjectTracker(db_path=str(tmp_path / 'tracker.db'), legacy_state_file=None, **kw)
+
+
+def _detection(name, bbox, location='floor'):
+    return {'name': name, 'bbox': list(bbox), 'location': location}
+
+
+@pytest.mark.parametrize('retention_days', [0, -1, float('nan'), '7', None, True])
+def test_rejects_invalid_retention(tmp_path, retention_days):
+    with pytest.raises(ValueError):
+        _tracker(tmp_path, retention_days=retention_days)
+
+
+@pytest.mark.parametrize('write_behind', [False, True])
+def test_track_expired_in_same_update_is_not_saved(tmp_path, write_behind):
+    tracker = _tracker(tmp_path, write_behind=write_behind)
+    # 생성과 동시에 만료되는 상황 (생성자 검증을 우회)
+    tracker.retention_days = -1
+    try:
+        tracker.update([_detection('cup', (0, 0, 10, 10))], 'a.jpg')
+        assert tracker.tracks == {}
+    finally:
+        tracker.store.close()
+
+    store = TrackStore(str(tmp_path / 'tracker.db'), legacy_state_file=None)
+    try:
+        tracks, next_track_id = store.load()
+    finally:
+        store.close()
+    assert tracks == {}
+    assert next_track_id == 1
+    assert not (tmp_path / 'tracker.db.rejected').exists()
+
+
+def test_registry_rejects_invalid_retention(tmp_path):
+    with pytest.raises(ValueError):
+        TrackerRegistry(storage_dir=str(tmp_path / 'trackers'), default_db=str(tmp_path / 'tracker.db'),
+                        retention_days=0)
+
+
+def _brute_force_problems(tracker, min_appearances, limit):
+    """순위 인덱스 도입 전 방식: 전체 트랙을 거르고 (문제 횟수, 비율) 내림차순 안정 정렬"""
+    problems = [
+        tracker._problem_entry(track) for track in tracker.tracks.values()
+        if track.appearances >= min_appearances and track.problem_count >= min_appearances
+    ]
+    problems.sort(key=lambda x: (x['problem_count'], x['problem_ratio']), reverse=True)
+    return problems if limit is None else problems[:limit]
+
+
+def _assert_same_ranking(tracker):
+    for min_appearances in (0, 1, 2, 3, 5):
+        for limit in (None, 0, 1, 3, 10):
+            expected = _brute_force_problems(tracker, min_appearances, limit)
+            assert tracker.get_problem_objects(min_appearances=min_appearances, limit=limit) == expected
+
+
+def test_problem_ranking_matches_full_sort(tmp_path):
+    rng = random.Random(1234)
+    # 겹치지 않는 칸 → 같은 칸의 같은 종류는 항상 같은 트랙에 매칭
+    cells = [(x * 100, y * 100, x * 100 + 50, y * 100 + 50) for x in range(5) for y in range(4)]
+    names = ['cup', 'book', 'bag']
+    locations = ['floor', 'bed_surface', 'desk', 'shelf']
+
+    tracker = _tracker(tmp_path, retention_days=365)
+    try:
+        for step in range(300):
+            detections = [
+                _detection(rng.choice(names), cell, rng.choice(locations))
+                for cell in rng.sample(cells, rng.randint(1, 6))
+            ]
+            tracker.update(detections, f'{step}.jpg')
+            if step % 25 == 0:
+                _assert_same_ranking(tracker)
+        _assert_same_ranking(tracker)
+
+        # 동점 (문제 횟수와 비율이 같은 트랙) 이 실제로 있어야 의미가 있음
+        keys = [(t.problem_count, t.problem_ratio) for t in tracker.tracks.values() if t.problem_count]
+        assert len(keys) > len(set(keys))
+    finally:
+        tracker.store.close()
+
+    # 다시 로드해 인덱스를 새로 만든 뒤에도 같은 순서
+    tracker = _tracker(tmp_path, retention_days=365)
+    try:
+        _assert_same_ranking(tracker)
+    finally:
+        tracker.store.close()
+
+
+def test_problem_ranking_ties_keep_track_order(tmp_path):
+    tracker = _tracker(tmp_path)
+    try:
+        # 같은 프레임에서 생긴 세 트랙, 모두 문제 2회 / 비율 1.0 → 생성 순서 유지
+        frame = [_detection('cup', (i * 100, 0, i * 100 + 50, 50)) for i in range(3)]
+        tracker.update(frame, 'a.jpg')
+        tracker.update(frame, 'b.jpg')
+        ranked = [p['track_id'] for p in tracker.get_problem_objects(min_appearances=2)]
+        assert ranked == ['0', '1', '2']
+        assert ranked == [p['track_id'] for p in _brute_force_problems(tracker, 2, None)]
+    finally:
+        tracker.store.close()
+
+
+def _appearances(tracker):
+    return {track_id: track.appearances for track_id, track in tracker.tracks.items()}
+
+
+def test_iou_matrix_matches_pairwise_iou():
+    boxes1 = [(0, 0, 100, 100), (50, 50, 150, 150), (0, 0, 0, 0)]
+    boxes2 = [(0, 0, 100, 30), (200, 200, 210, 210), (25, 25, 75, 75), (0, 0, 0, 0)]
+    expected = np.array([
+        [0.3, 0.0, 0.25, 0.0],
+        [0.0, 0.0, 625 / 11875, 0.0],
+        [0.0, 0.0, 0.0, 0.0],
+    ])
+    assert np.allclose(iou_matrix(boxes1, boxes2), expected)
+
+
+def test_two_detections_cannot_share_one_track(tmp_path):
+    tracker = _tracker(tmp_path)
+    try:
+        tracker.update([_detection('cup', (0, 0, 100, 100))], 'a.jpg')
+        # 둘 다 트랙 0 과 많이 겹치지만 하나만 매칭 (더 많이 겹치는 쪽), 나머지는 새 트랙
+        tracker.update([
+            _detection('cup', (10, 0, 110, 100)),
+            _detection('cup', (0, 0, 100, 100)),
+        ], 'b.jpg')
+
+        assert _appearances(tracker) == {'0': 2, '1': 1}
+        assert tracker.tracks['0'].history[-1]['bbox'] == [0, 0, 100, 100]
+        assert tracker.tracks['1'].history[-1]['bbox'] == [10, 0, 110, 100]
+    finally:
+        tracker.store.close()
+
+
+@pytest.mark.parametrize('height, matched', [(29, False), (30, False), (31, True)])
+def test_iou_at_or_below_threshold_is_not_matched(tmp_path, height, matched):
+    tracker = _tracker(tmp_path, iou_threshold=0.3)
+    try:
+        tracker.update([_detection('cup', (0, 0, 100, 100))], 'a.jpg')
+        # (0, 0, 100, h) 는 트랙과 IoU = h / 100
+        tracker.update([_detection('cup', (0, 0, 100, height))], 'b.jpg')
+
+        expected = {'0': 2} if matched else {'0': 1, '1': 1}
+        assert _appearances(tracker) == expected
+    finally:
+        tracker.store.close()
+
+
+def test_detections_never_match_other_classes(tmp_path):
+    tracker = _tracker(tmp_path)
+    try:
+        tracker.update([_detection('cup', (0, 0, 100, 100))], 'a.jpg')
+        # 같은 자리라도 종류가 다르면 새 트랙
+        tracker.update([_detection('book', (0, 0, 100, 100))], 'b.jpg')
+        assert _appearances(tracker) == {'0': 1, '1': 1}
+
+        # 같은 자리에 두 종류가 함께 있으면 각자 자기 종류의 트랙으로
+        tracker.update([
+            _detection('book', (0, 0, 100, 100)),
+            _detection('cup', (0, 0, 100, 100)),
+        ], 'c.jpg')
+        assert _appearances(tracker) == {'0': 2, '1': 2}
+        assert tracker.tracks['0'].object == 'cup'
+        assert tracker.tracks['1'].object == 'book'
+    finally:
+        tracker.store.close()
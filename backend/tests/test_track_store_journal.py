@@ -0,0 +1,195 @@
+# backend/tests/test_track_store_journal.py
+"""
+TrackStore write-behind 저널 복구 테스트
+- 자식 프로세스가 저널에 변경분을 쓰는 도중 SIGKILL
+- 다시 열었을 때 응답(fsync)까지 끝난 변경분은 모두 반영되고, 쓰다 만 마지막 줄은 무시되는지
+- 반영(flush) 실패 시 변경분과 저널이 그대로 남는지
+- 적용할 수 없는 저널 항목은 .rejected 로 옮기고 저장소는 정상적으로 열리는지
+"""
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import textwrap
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import BACKEND_DIR
+from utils.track_store import TrackStore
+
+# 트랙 하나를 만들고 관측 하나를 추가하는 update() 를 계속 기록하는 자식 프로세스
+# apply_update() 가 반환된 뒤(저널 fsync 완료)에만 트랙 id 를 stdout 으로 알린다
+WRITER = textwrap.dedent('''
+    import sys
+    from types import SimpleNamespace
+    sys.path.insert(0, {backend!r})
+    from utils.track_store import TrackStore
+
+    store = TrackStore({db!r}, legacy_state_file=None, write_behind=True,
+                       flush_every=7, flush_interval=0.05)
+    track_id = 0
+    while True:
+        ts = '2024-01-01T00:00:00'
+        track = SimpleNamespace(object='cup', first_seen=ts, last_seen=ts, appearances=1,
+                                problem_count=1, location_counts={{'floor': 1}})
+        observation = {{'bbox': [0, 0, 10, 10], 'location': 'floor', 'timestamp': ts, 'image': 'x.jpg'}}
+        store.apply_update({{str(track_id): track}}, [(str(track_id), observation)], [], track_id + 1)
+        print(track_id, flush=True)
+        track_id += 1
+''')
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason='SIGKILL 필요')
+def test_replay_after_sigkill_mid_batch(tmp_path):
+    db = str(tmp_path / 'tracker.db')
+    child = subprocess.Popen(
+        [sys.executable, '-c', WRITER.format(backend=BACKEND_DIR, db=db)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+
+    acked = []
+    try:
+        # 반영 스레드가 여러 번 돈 뒤(일부는 DB, 일부는 저널에만 있는 상태)에 강제 종료
+        for line in child.stdout:
+            acked.append(int(line))
+            if len(acked) >= 200:
+                break
+    finally:
+        os.kill(child.pid, signal.SIGKILL)
+        child.wait()
+
+    assert len(acked) >= 200
+
+    # 쓰다 만 마지막 줄 (fsync 전에 죽은 변경분)
+    with open(db + '.journal', 'ab') as f:
+        f.write(b'{"seq": 999999, "tracks": [[999999, "cup", "2024-')
+
+    store = TrackStore(db, legacy_state_file=None)
+    try:
+        tracks, next_track_id = store.load()
+    finally:
+        store.close()
+
+    track_ids = {int(t) for t in tracks}
+    assert set(acked) <= track_ids
+    assert 999999 not in track_ids
+    assert next_track_id >= acked[-1] + 1
+    for track_id in acked:
+        track = tracks[str(track_id)]
+        assert track['appearances'] == 1
+        assert len(track['history']) == 1
+
+    # 복구 후 저널은 정리되고, 다시 열어도 같은 상태
+    assert not os.path.exists(db + '.journal')
+    store = TrackStore(db, legacy_state_file=None)
+    try:
+        assert store.load()[0].keys() == tracks.keys()
+    finally:
+        store.close()
+
+
+def _track(ts='2024-01-01T00:00:00'):
+    return SimpleNamespace(object='cup', first_seen=ts, last_seen=ts, appearances=1,
+                           problem_count=1, location_counts={'floor': 1})
+
+
+def _observation(ts='2024-01-01T00:00:00'):
+    return {'bbox': [0, 0, 10, 10], 'location': 'floor', 'timestamp': ts, 'image': 'x.jpg'}
+
+
+def _fail_apply(changes):
+    raise sqlite3.OperationalError('disk I/O error')
+
+
+def _write_behind_store(db):
+    # 반영은 테스트에서 직접 flush() 로만
+    return TrackStore(db, legacy_state_file=None, write_behind=True,
+                      flush_every=10 ** 6, flush_interval=3600)
+
+
+def test_failed_flush_keeps_batch_and_journal(tmp_path):
+    db = str(tmp_path / 'tracker.db')
+    store = _write_behind_store(db)
+    try:
+        for track_id in (0, 1):
+            store.apply_update({str(track_id): _track()}, [(str(track_id), _observation())], [], track_id + 1)
+
+        apply_changes = store._apply_changes
+        store._apply_changes = _fail_apply
+        with pytest.raises(sqlite3.OperationalError):
+            store.flush()
+        store._apply_changes = apply_changes
+
+        store.apply_update({'2': _track()}, [('2', _observation())], [], 3)
+        store.flush()
+    finally:
+        store.close()
+
+    store = TrackStore(db, legacy_state_file=None)
+    try:
+        tracks, next_track_id = store.load()
+    finally:
+        store.close()
+
+    assert sorted(int(t) for t in tracks) == [0, 1, 2]
+    assert next_track_id == 3
+    assert all(len(track['history']) == 1 for track in tracks.values())
+
+
+def test_failed_flush_survives_crash(tmp_path):
+    """반영 실패 후 그대로 죽어도 저널에 남은 변경분으로 복구"""
+    db = str(tmp_path / 'tracker.db')
+    store = _write_behind_store(db)
+    store.apply_update({'0': _track()}, [('0', _observation())], [], 1)
+    store._apply_changes = _fail_apply
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+
+    # close() 없이 (비정상 종료) 다시 열기
+    store._flusher.unregister(store)
+    store._journal.close()
+    store._conn.close()
+
+    store = TrackStore(db, legacy_state_file=None)
+    try:
+        assert list(store.load()[0]) == ['0']
+    finally:
+        store.close()
+
+
+def test_replay_rejects_bad_entry_without_failing_open(tmp_path):
+    db = str(tmp_path / 'tracker.db')
+    TrackStore(db, legacy_state_file=None).close()
+
+    def change(seq, track_id, with_track=True):
+        return {
+            'seq': seq,
+            'tracks': [[track_id, 'cup', 'ts', 'ts', 1, 1, {'floor': 1}]] if with_track else [],
+            'observations': [[track_id, [0, 0, 10, 10], 'floor', 'ts', 'x.jpg']],
+            'removed': [],
+            'next_track_id': track_id + 1
+        }
+
+    # 가운데 항목은 없는 트랙의 관측 (외래 키 위반)
+    with open(db + '.journal', 'wb') as f:
+        for entry in (change(1, 0), change(2, 1, with_track=False), change(3, 2)):
+            f.write(json.dumps(entry).encode('utf-8') + b'\n')
+
+    store = TrackStore(db, legacy_state_file=None)
+    try:
+        tracks, next_track_id = store.load()
+    finally:
+        store.close()
+
+    assert sorted(int(t) for t in tracks) == [0, 2]
+    assert next_track_id == 3
+    assert not os.path.exists(db + '.journal')
+    with open(db + '.rejected', 'rb') as f:
+        rejected = [json.loads(line) for line in f]
+    assert [entry['change']['seq'] for entry in rejected] == [2]
+    assert 'FOREIGN KEY' in rejected[0]['error']
@@ -0,0 +1,324 @@
+# backend/utils/advice.py
+"""
+ChatGPT 정리 조언 생성
+- stream 모드: /analyze 는 조언 id 만 돌려주고, 생성은 백그라운드에서 시작
+  → /advice/<id>/stream (Server-Sent Events) 로 토큰이 도착하는 대로 전달
+- 생성된 토큰은 버퍼에 쌓이므로 늦게 연결하거나 다시 연결해도 처음부터 받음
+- 전체 시간 제한, 취소, 오래된 조언 정리 (TTL)
+  → 토큰이 끊겨도 감시 타이머가 시간 제한에 맞춰 끝내고, 막힌 읽기는 읽기 시간 제한으로 풀림
+- 같은 방 상태의 조언은 AdviceCache 에서 재사용 (LLM 호출 없음)
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import Timeout
+
+FAILURE_MESSAGE = "정리 조언 생성에 실패했습니다."
+
+
+def build_messages(detections, score):
+    """YOLO 감지 결과 기반 ChatGPT 메시지"""
+    detected_items = ", ".join([d["name"] for d in detections]) or "아무것도 감지되지 않음"
+
+    prompt = f"""
+너는 최고 수준의 방 정리 전문가야.
+
+아래는 YOLO가 감지한 방의 물건 리스트야:
+[{detected_items}]
+
+이 방의 정리 점수는 {score}점이야.
+
+이 정보를 기반으로 다음을 5~8줄로 간결하게 한국어로 작성해줘.
+1) 방 전체 상태 요약
+2) 정리 우선순위 TOP 3
+3) 물건들을 어디에 정리하면 좋은지 (책상, 서랍, 옷장 등)
+4) 전체적인 정리 루틴 제안
+"""
+    return [
+        {"role": "system", "content": "너는 방 정리 전문가다."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class AdviceJob:
+    """생성 중인 조언 하나 (토큰 버퍼 + 상태)"""
+
+    def __init__(self, job_id, detections, score, suffix):
+        self.id = job_id
+        self.detections = detections
+        self.score = score
+        self.messages = build_messages(detections, score)
+        self.suffix = suffix
+        self.created = time.monotonic()
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cancelled = threading.Event()
+        self._stream = None  # 생성 중인 OpenAI 스트림
+        self._cond = threading.Condition()
+
+    def attach(self, stream):
+        """생성 중인 스트림 등록 (이미 끝났으면 바로 닫음)"""
+        with self._cond:
+            self._stream = stream
+            done = self.done
+        if done:
+            self.close_stream()
+
+    def close_stream(self):
+        """스트림 연결을 끊음 (다른 스레드에서 호출해도 됨)"""
+        with self._cond:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                print(f"⚠️ 조언 스트림 닫기 실패: {e}")
+
+    def append(self, text):
+        """토큰 추가 (이미 끝났으면 무시)"""
+        with self._cond:
+            if self.done:
+                return
+            self.chunks.append(text)
+            self._cond.notify_all()
+
+    def finish(self, error=None, suffix=''):
+        """
+        끝남 표시 (이미 끝났으면 무시)
+
+        실패면 실패 문구를, 취소가 아니면 고정 문구(suffix)를 덧붙인다.
+
+        Returns:
+            bool: 이번 호출로 끝났는지
+        """
+        with self._cond:
+            if self.done:
+                return False
+            if error and error != 'cancelled' and not self.chunks:
+                self.chunks.append(FAILURE_MESSAGE)
+            if suffix and error != 'cancelled':
+                self.chunks.append(suffix)
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+        return True
+
+    def wait(self, seen, timeout):
+        """seen 개 이후의 토큰이 생기거나 끝날 때까지 대기 → (새 토큰 목록, 끝났는지)"""
+        with self._cond:
+            if len(self.chunks) == seen and not self.done:
+                self._cond.wait(timeout)
+            return self.chunks[seen:], self.done
+
+    @property
+    def text(self):
+        with self._cond:
+            return ''.join(self.chunks)
+
+
+class AdviceService:
+    """OpenAI 스트리밍 조언 생성기"""
+
+    def __init__(self, client, model="gpt-4o-mini", timeout=60, read_timeout=20, ttl=600, max_jobs=200,
+                 max_workers=4, cache=None):
+        self.client = client
+        self.cache = cache  # AdviceCache (None 이면 캐시 안 함)
+        self.model = model
+        self.timeout = timeout  # 조언 하나의 전체 생성 시간 제한 (초)
+        self.read_timeout = min(read_timeout, timeout)  # 토큰 사이 최대 대기 (초)
+        self.ttl = ttl  # 끝난 조언을 보관하는 시간 (초)
+        self.max_jobs = max_jobs
+
+        self._jobs = OrderedDict()  # {id: AdviceJob} (오래된 것부터)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='advice')
+
+    # ------------------------------------------
+    # 동기 생성 (ADVICE_MODE=sync)
+    # ------------------------------------------
+    def generate(self, detections, score):
+        """조언 전체를 한 번에 생성"""
+        cached = self._cached(detections, score)
+        if cached is not None:
+            return cached
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=build_messages(detections, score),
+                timeout=self.timeout
+            )
+            advice = response.choices[0].message.content
+            self._store(detections, score, advice)
+            return advice
+        except Exception as e:
+            print("ChatGPT 오류:", e)
+            return FAILURE_MESSAGE
+
+    # ------------------------------------------
+    # 스트리밍 생성
+    # ------------------------------------------
+    def start(self, detections, score, suffix=''):
+        """
+        백그라운드 생성 시작
+
+        Args:
+            suffix: 생성된 조언 뒤에 붙일 고정 문구 (반복 문제, 쌓임 경고)
+
+        Returns:
+            str | None: 조언 id (생성 중인 조언이 max_jobs 개로 가득 차 있으면 None)
+        """
+        job = AdviceJob(uuid.uuid4().hex, detections, score, suffix)
+        with self._lock:
+            self._purge()
+            if len(self._jobs) >= self.max_jobs:
+                return None
+            self._jobs[job.id] = job
+
+        cached = self._cached(detections, score)
+        if cached is not None:
+            # 캐시 적중: 생성 없이 바로 완료
+            job.append(cached)
+            job.finish(suffix=suffix)
+        else:
+            self._executor.submit(self._run, job)
+        return job.id
+
+    def _run(self, job):
+        if job.cancelled.is_set():
+            job.finish('cancelled')
+            return
+
+        # 토큰이 끊겨도 시간 제한이 지나면 감시 타이머가 조언을 끝냄
+        # (막힌 읽기는 읽기 시간 제한으로 풀리고, 그 뒤 도착한 토큰은 무시됨)
+        watchdog = threading.Timer(self.timeout, self._expire, (job,))
+        watchdog.daemon = True
+        watchdog.start()
+
+        error = None
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=job.messages,
+                stream=True,
+                timeout=Timeout(self.timeout, read=self.read_timeout)
+            )
+            job.attach(stream)
+            for event in stream:
+                if job.done:
+                    break
+                if event.choices and event.choices[0].delta.content:
+                    job.append(event.choices[0].delta.content)
+        except Exception as e:
+            if not job.done:
+                print("ChatGPT 오류:", e)
+            error = str(e)
+        finally:
+            watchdog.cancel()
+            # 취소/시간 초과 시 연결을 끊어 남은 토큰 생성을 멈춤
+            job.close_stream()
+
+        if job.done:
+            # 취소 또는 시간 초과로 이미 끝남
+            return
+        if error is None:
+            self._store(job.detections, job.score, job.text)
+        job.finish(error, job.suffix)
+
+    def _expire(self, job):
+        """감시 타이머: 전체 시간 제한이 지나면 토큰 도착과 상관없이 끝냄"""
+        error = f"{self.timeout}초 안에 조언 생성이 끝나지 않았습니다"
+        if job.finish(error, job.suffix):
+            print("ChatGPT 오류:", error)
+        job.close_stream()
+
+    def _cached(self, detections, score):
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(detections, score)
+        except Exception as e:
+            print(f"⚠️ 조언 캐시 조회 실패: {e}")
+            return None
+
+    def _store(self, detections, score, advice):
+        if self.cache is None or not advice:
+            return
+        try:
+            self.cache.put(detections, score, advice)
+        except Exception as e:
+            print(f"⚠️ 조언 캐시 저장 실패: {e}")
+
+    def cancel(self, job_id):
+        """
+        생성 취소 (대기 중이면 시작하지 않고, 생성 중이면 바로 끝내고 스트림을 닫음)
+
+        Returns:
+            bool: 해당 조언이 있었는지
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancelled.set()
+        job.finish('cancelled')
+        job.close_stream()
+        return True
+
+    def stream(self, job_id, keepalive=15):
+        """
+        SSE 이벤트 생성기 (없는 id 면 None)
+
+        이벤트: token {text}, done {text, error}, 연결 유지용 주석(: ping)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        def generate():
+            seen = 0
+            while True:
+                chunks, done = job.wait(seen, keepalive)
+                for text in chunks:
+                    yield _sse('token', {'text': text})
+                seen += len(chunks)
+
+                if done:
+                    yield _sse('done', {'text': job.text, 'error': job.error})
+                    return
+                if not chunks:
+                    yield ": ping\n\n"
+
+        return generate()
+
+    def _purge(self):
+        """
+        _lock 보유 상태에서 호출: 끝난 조언 중 TTL 이 지난 것, 개수 초과 시 오래된 것부터 삭제
+
+        생성 중이거나 대기 중인 조언은 지우지 않는다 (시간 제한이 지나면 스스로 끝남).
+        """
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            expired = now - job.created > self.ttl + self.timeout
+            if not (expired or len(self._jobs) >= self.max_jobs):
+                break
+            if job.done:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancelled.set()
+                job.finish('cancelled')
+                job.close_stream()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+# backend/utils/advice_cache.py
+"""
+ChatGPT 조언 캐시 (SQLite)
+- 키: 물체 종류별 개수 + 위치 분포(대략) + 점수 구간 → 같은 방 상태면 같은 조언 재사용
+- TTL 이 지난 항목은 사용하지 않고, 개수 제한을 넘으면 가장 오래 안 쓰인 항목부터 삭제 (LRU)
+- 적중/실패/저장/삭제 횟수 지표
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+SCORE_BUCKET = 10  # 점수 구간 크기
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS advice_cache (
+        key TEXT PRIMARY KEY,
+        signature TEXT NOT NULL,
+        advice TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_advice_cache_last_used ON advice_cache(last_used);
+'''
+
+
+def _coarse(count):
+    """개수를 대략적인 단계로 (1, 2~3, 4 이상)"""
+    if count <= 1:
+        return count
+    return 2 if count <= 3 else 4
+
+
+def advice_signature(detections, score):
+    """
+    조언 캐시 키 재료 (정규화된 방 상태)
+
+    Returns:
+        dict: {objects: {이름: 개수}, locations: {위치: 단계}, score: 점수 구간 시작}
+    """
+    objects = Counter(d['name'] for d in detections)
+    locations = Counter(d.get('location', 'unknown') for d in detections)
+    return {
+        'objects': dict(sorted(objects.items())),
+        'locations': {loc: _coarse(n) for loc, n in sorted(locations.items())},
+        'score': int(score) // SCORE_BUCKET * SCORE_BUCKET
+    }
+
+
+def advice_key(detections, score):
+    """정규화된 방 상태 → 캐시 키"""
+    signature = json.dumps(advice_signature(detections, score), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()[:32], signature
+
+
+class AdviceCache:
+    """TTL + LRU 조언 캐시"""
+
+    def __init__(self, db_path='advice_cache.db', ttl=7 * 24 * 3600, max_entries=5000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        self._metrics = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def get(self, detections, score):
+        """
+        캐시된 조언 조회 (TTL 이내만)
+
+        Returns:
+            str | None: 조언 (없으면 None)
+        """
+        key, _ = advice_key(detections, score)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT advice FROM advice_cache WHERE key = ? AND created_at >= ?',
+                (key, now - self.ttl)
+            ).fetchone()
+
+            if row is None:
+                self._metrics['misses'] += 1
+                return None
+
+            with self._conn:
+                self._conn.execute(
+                    'UPDATE advice_cache SET last_used = ?, hits = hits + 1 WHERE key = ?',
+                    (now, key)
+                )
+            self._metrics['hits'] += 1
+            return row[0]
+
+    def put(self, detections, score, advice):
+        """조언 저장 (개수 제한 초과분은 LRU 순으로 삭제)"""
+        key, signature = advice_key(detections, score)
+        now = time.time()
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO advice_cache (key, signature, advice, created_at, last_used, hits) '
+                'VALUES (?, ?, ?, ?, ?, 0)',
+                (key, signature, advice, now, now)
+            )
+            self._metrics['stores'] += 1
+
+            # 만료 항목 먼저, 그래도 넘치면 가장 오래 안 쓰인 것부터
+            evicted = self._conn.execute(
+                'DELETE FROM advice_cache WHERE created_at < ?', (now - self.ttl,)
+            ).rowcount
+            excess = self._conn.execute('SELECT COUNT(*) FROM advice_cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                evicted += self._conn.execute(
+                    'DELETE FROM advice_cache WHERE key IN ('
+                    '  SELECT key FROM advice_cache ORDER BY last_used LIMIT ?'
+                    ')',
+                    (excess,)
+                ).rowcount
+            self._metrics['evictions'] += evicted
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = self._conn.execute('SELECT COUNT(*) FROM advice_cache').fetchone()[0]
+
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_rate'] = round(metrics['hits'] / lookups, 3) if lookups else 0
+        return metrics
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
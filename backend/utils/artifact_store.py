@@ -0,0 +1,232 @@
+# backend/utils/artifact_store.py
+"""
+내용 주소 기반 아티팩트 저장소 (uploads/, results/)
+- 파일명 = 내용 해시(key) + 변형(variant) → 이름 충돌 없음, 같은 업로드는 한 번만 저장
+- 임시 파일에 쓴 뒤 rename → 쓰다 만 파일은 절대 제공되지 않음
+- 접근 시각 추적 + 용량 예산 초과 시 가장 오래 안 쓰인 파일부터 삭제 (LRU)
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+TMP_PREFIX = '.tmp-'
+KEY_LENGTH = 32  # sha256 hex 앞 32자 (128bit)
+
+# 접근 시각을 디스크(mtime)에 반영하는 최소 간격 (재시작 후 LRU 순서 복원용)
+TOUCH_INTERVAL_SECONDS = 60
+
+
+def content_key(data):
+    """내용 해시 키"""
+    return hashlib.sha256(data).hexdigest()[:KEY_LENGTH]
+
+
+def is_valid_key(key):
+    return len(key) == KEY_LENGTH and all(c in '0123456789abcdef' for c in key)
+
+
+def atomic_write(path, data):
+    """임시 파일 + fsync + rename 으로 원자적 쓰기"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=TMP_PREFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class ArtifactStore:
+    """용량 제한이 있는 내용 주소 기반 파일 저장소"""
+
+    def __init__(self, root, max_bytes, on_evict=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        # 용량 초과로 key 의 변형이 삭제될 때 호출: on_evict(key, variant)
+        self.on_evict = on_evict
+
+        self._entries = OrderedDict()  # {파일명: [key, variant, size, 마지막 touch]}
+        self._variants = {}  # {key: set(variant)}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def filename(key, variant):
+        """디스크 파일명: <key>.<variant>"""
+        return f"{key}.{variant}"
+
+    def path(self, key, variant):
+        return os.path.join(self.root, self.filename(key, variant))
+
+    def _scan(self):
+        """기존 파일을 마지막 접근(mtime) 순으로 등록하고, 남은 임시 파일은 삭제"""
+        files = []
+        for entry in os.scandir(self.root):
+            if not entry.is_file():
+                continue
+
+            if entry.name.startswith(TMP_PREFIX):
+                # 쓰기 도중 죽은 프로세스가 남긴 파일
+                os.remove(entry.path)
+                continue
+
+            key, _, variant = entry.name.partition('.')
+            if not variant or not is_valid_key(key):
+                continue
+
+            stat = entry.stat()
+            files.append((stat.st_mtime, key, variant, stat.st_size))
+
+        for mtime, key, variant, size in sorted(files):
+            self._register(key, variant, size, mtime)
+
+    def _register(self, key, variant, size, touched=None):
+        name = self.filename(key, variant)
+        old = self._entries.pop(name, None)
+        if old is not None:
+            self._total_bytes -= old[2]
+
+        self._entries[name] = [key, variant, size, touched or time.time()]
+        self._variants.setdefault(key, set()).add(variant)
+        self._total_bytes += size
+
+    def _unregister(self, name):
+        key, variant, size, _ = self._entries.pop(name)
+        self._total_bytes -= size
+
+        variants = self._variants.get(key)
+        if variants is not None:
+            variants.discard(variant)
+            if not variants:
+                del self._variants[key]
+
+        try:
+            os.remove(os.path.join(self.root, name))
+        except FileNotFoundError:
+            pass
+        return key, variant
+
+    # ------------------------------------------
+    # 쓰기
+    # ------------------------------------------
+    def put(self, key, variant, data):
+        """
+        변형 파일 저장 (원자적)
+
+        Returns:
+            str: 저장된 파일 경로
+        """
+        path = self.path(key, variant)
+        atomic_write(path, data)
+
+        with self._lock:
+            self._register(key, variant, len(data))
+            evicted = self._evict(keep=self.filename(key, variant))
+
+        self._notify(evicted)
+        return path
+
+    def put_content(self, data, variant):
+        """
+        내용 해시를 키로 저장 (같은 내용이면 다시 쓰지 않음)
+
+        Returns:
+            tuple: (key, 파일 경로, 새로 저장했는지)
+        """
+        key = content_key(data)
+
+        if self.get(key, variant) is not None:
+            return key, self.path(key, variant), False
+
+        return key, self.put(key, variant, data), True
+
+    # ------------------------------------------
+    # 읽기
+    # ------------------------------------------
+    def get(self, key, variant):
+        """
+        파일 경로 반환 + 접근 시각 갱신
+
+        Returns:
+            str | None: 파일 경로 (없으면 None)
+        """
+        name = self.filename(key, variant)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(name)
+            touch = now - entry[3] >= TOUCH_INTERVAL_SECONDS
+            if touch:
+                entry[3] = now
+
+        path = os.path.join(self.root, name)
+        if touch:
+            try:
+                os.utime(path, (now, now))
+            except FileNotFoundError:
+                pass
+        return path
+
+    def contains(self, key, variant):
+        with self._lock:
+            return self.filename(key, variant) in self._entries
+
+    def variants(self, key):
+        with self._lock:
+            return set(self._variants.get(key, ()))
+
+    # ------------------------------------------
+    # 삭제
+    # ------------------------------------------
+    def remove(self, key, variant=None):
+        """변형 하나 또는 key 의 모든 변형 삭제 (on_evict 는 호출하지 않음)"""
+        with self._lock:
+            variants = [variant] if variant else list(self._variants.get(key, ()))
+            for v in variants:
+                name = self.filename(key, v)
+                if name in self._entries:
+                    self._unregister(name)
+
+    def _evict(self, keep=None):
+        """lock 보유 상태에서 호출: 예산 초과분을 LRU 순으로 삭제"""
+        evicted = []
+        while self._total_bytes > self.max_bytes:
+            oldest = next((n for n in self._entries if n != keep), None)
+            if oldest is None:
+                break
+            evicted.append(self._unregister(oldest))
+        return evicted
+
+    def _notify(self, evicted):
+        if not self.on_evict:
+            return
+        for key, variant in evicted:
+            try:
+                self.on_evict(key, variant)
+            except Exception as e:
+                print(f"⚠️ 삭제 콜백 실패 ({key}.{variant}): {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'files': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
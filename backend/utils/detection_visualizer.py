@@ -0,0 +1,74 @@
+# backend/utils/detection_visualizer.py
+"""
+탐지 결과 시각화
+- 위치별 색상 박스 + 라벨
+- 쌓임 그룹 반투명 표시
+"""
+import cv2
+
+# 위치별 색상
+LOCATION_COLORS = {
+    'floor': (0, 0, 255),        # 빨강
+    'bed_surface': (0, 255, 255), # 노랑
+    'desk': (0, 255, 0),          # 초록
+    'furniture': (255, 128, 0),   # 주황
+    'wall_shelf': (255, 0, 255),  # 마젠타
+    'normal': (128, 128, 128)     # 회색
+}
+
+
+def render_detections(img, detections, stacks):
+    """
+    탐지 박스와 쌓임 그룹이 표시된 결과 이미지 생성
+
+    Args:
+        img: 원본 이미지 (BGR ndarray)
+        detections: 위치 정보가 포함된 탐지 결과
+        stacks: detect_stacks() 결과
+
+    Returns:
+        np.ndarray: 결과 이미지
+    """
+    img = img.copy()
+
+    for detection in detections:
+        x1, y1, x2, y2 = detection['bbox']
+        location = detection.get('location', 'unknown')
+        color = LOCATION_COLORS.get(location, (255, 255, 255))
+
+        # 박스 그리기
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, 2)
+
+        # 라벨
+        label = f"{detection['name']} ({detection['conf']:.2f})"
+        label_with_loc = f"{label} [{location}]"
+
+        # 배경
+        (text_w, text_h), _ = cv2.getTextSize(
+            label_with_loc, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1
+        )
+        cv2.rectangle(img, (x1, y1 - text_h - 5), (x1 + text_w, y1), color, -1)
+
+        # 텍스트
+        cv2.putText(img, label_with_loc, (x1, y1 - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    # 쌓임 그룹 표시
+    for stack in stacks:
+        x1, y1, x2, y2 = stack['bounding_box']
+        stack_color = (0, 0, 255) if stack['severity'] == 'high' else (0, 165, 255)
+
+        # 반투명 박스
+        overlay = img.copy()
+        cv2.rectangle(overlay, (x1, y1), (x2, y2), stack_color, -1)
+        img = cv2.addWeighted(img, 0.7, overlay, 0.3, 0)
+
+        # 테두리
+        cv2.rectangle(img, (x1, y1), (x2, y2), stack_color, 3)
+
+        # 라벨
+        stack_label = f"STACK: {stack['object']} x{stack['count']}"
+        cv2.putText(img, stack_label, (x1 + 5, y1 + 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+    return img
@@ -22,6 +22,22 @@ def generate_heatmap(image_path, detections, output_path):
     if img is None:
         raise ValueError(f"이미지를 읽을 수 없습니다: {image_path}")
     
+    cv2.imwrite(output_path, render_heatmap(img, detections))
+    
+    return output_path
+
+
+def render_heatmap(img, detections):
+    """
+    히트맵 합성 이미지 생성 (파일 저장 없음)
+    
+    Args:
+        img: 원본 이미지 (BGR ndarray)
+        detections: YOLO 탐지 결과 리스트
+    
+    Returns:
+        np.ndarray: 히트맵이 합성된 이미지
+    """
     height, width = img.shape[:2]
     
     # 빈 히트맵 생성
@@ -68,8 +84,7 @@ def generate_heatmap(image_path, detections, output_path):
     
     # 히트맵이 비어있으면 원본 반환
     if heatmap.max() == 0:
-        cv2.imwrite(output_path, img)
-        return output_path
+        return img.copy()
     
     # 정규화 (0-255)
     heatmap_normalized = np.uint8(255 * heatmap / heatmap.max())
@@ -78,9 +93,4 @@ def generate_heatmap(image_path, detections, output_path):
     heatmap_color = cv2.applyColorMap(heatmap_normalized, cv2.COLORMAP_JET)
     
     # 원본과 합성 (60% 원본 + 40% 히트맵)
-    result = cv2.addWeighted(img, 0.6, heatmap_color, 0.4, 0)
-    
-    # 저장
-    cv2.imwrite(output_path, result)
-    
-    return output_path
\ No newline at end of file
+    return cv2.addWeighted(img, 0.6, heatmap_color, 0.4, 0)
\ No newline at end of file
@@ -0,0 +1,227 @@
+# backend/utils/history_archive.py
+"""
+분석 기록 보관(아카이브)
+- 보관 기간이 지난 기록을 월별 gzip NDJSON 파일로 옮기고 DB 에서 삭제
+  (일별/주별 롤업과 누적 통계는 그대로 남음)
+- 보관 경계는 항상 주 시작 시각 → 롤업 구간이 보관분과 DB 분으로 나뉘지 않음
+- 삭제 후 증분 VACUUM 으로 공간 반환
+- export_history: 보관 파일 + DB 기록을 저장 순서대로 NDJSON 으로 내보내기
+"""
+import gzip
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from db import (
+    get_connection, archive_watermark, set_meta, incremental_vacuum, _week_start
+)
+
+
+def _month_range(ts_epoch):
+    """epoch 초가 속한 달의 (이름, 시작, 다음 달 시작)"""
+    d = datetime.fromtimestamp(ts_epoch)
+    start = datetime(d.year, d.month, 1)
+    end = datetime(d.year + d.month // 12, d.month % 12 + 1, 1)
+    return start.strftime('%Y-%m'), int(start.timestamp()), int(end.timestamp())
+
+
+def _detections_by_analysis(conn, analysis_ids):
+    result = {}
+    for i in range(0, len(analysis_ids), 500):
+        chunk = analysis_ids[i:i + 500]
+        rows = conn.execute(
+            f'SELECT analysis_id, class_id, name, conf, x1, y1, x2, y2, location FROM detections '
+            f'WHERE analysis_id IN ({",".join("?" * len(chunk))}) ORDER BY id',
+            chunk
+        )
+        for analysis_id, class_id, name, conf, x1, y1, x2, y2, location in rows:
+            result.setdefault(analysis_id, []).append({
+                'class_id': class_id,
+                'name': name,
+                'conf': conf,
+                'bbox': [x1, y1, x2, y2],
+                'location': location
+            })
+    return result
+
+
+def _records(conn, start, end, batch_size=500):
+    """[start, end) 기록을 탐지 결과와 함께 id 순으로"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            'SELECT id, timestamp, ts_epoch, score, total_objects, floor_items, image_name, suggestions, '
+            'detections FROM analyses WHERE ts_epoch >= ? AND ts_epoch < ? AND id > ? ORDER BY id LIMIT ?',
+            (start, end, last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            return
+
+        detections = _detections_by_analysis(conn, [r[0] for r in rows])
+        for r in rows:
+            record = {
+                'id': r[0],
+                'timestamp': r[1],
+                'ts_epoch': r[2],
+                'score': r[3],
+                'total_objects': r[4],
+                'floor_items': r[5],
+                'image_name': r[6],
+                'suggestions': json.loads(r[7]) if r[7] else [],
+                'detections': detections.get(r[0], [])
+            }
+            if r[8] is not None:
+                # 마이그레이션 5 에서 모두 옮기지 못해 남겨 둔 원본 JSON
+                record['detections_json'] = r[8]
+            yield record
+        last_id = rows[-1][0]
+
+
+def _write_archive(path, records):
+    """
+    gzip NDJSON 파일을 임시 파일 + fsync + rename 으로 기록
+
+    Returns:
+        dict: {rows, first_id, last_id, first_ts, last_ts, score_sum, score_max} (기록이 없으면 None)
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    summary = None
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as gz:
+                for record in records:
+                    gz.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+                    if summary is None:
+                        summary = {'rows': 0, 'first_id': record['id'], 'first_ts': record['ts_epoch'],
+                                   'score_sum': 0, 'score_max': record['score']}
+                    summary['rows'] += 1
+                    summary['last_id'] = record['id']
+                    summary['last_ts'] = record['ts_epoch']
+                    summary['score_sum'] += record['score']
+                    summary['score_max'] = max(summary['score_max'], record['score'])
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        if summary is None:
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return summary
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def archive_old_analyses(retention_days, archive_dir='archive'):
+    """
+    retention_days 보다 오래된 기록을 월별 보관 파일로 옮김
+
+    파일을 디스크에 확정(fsync + rename)한 뒤에 DB 에서 삭제하므로
+    중간에 멈춰도 기록을 잃지 않는다. 다시 실행하면 같은 파일명으로 덮어쓴다.
+
+    Returns:
+        int: 보관한 기록 수
+    """
+    if retention_days <= 0:
+        return 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    conn = get_connection()
+
+    cutoff = _week_start(time.time() - retention_days * 86400)
+    oldest = conn.execute(
+        'SELECT MIN(ts_epoch) FROM analyses WHERE ts_epoch < ?', (cutoff,)
+    ).fetchone()[0]
+    if oldest is None:
+        return 0
+
+    total = 0
+    month_start = oldest
+    while month_start < cutoff:
+        month, start, next_month = _month_range(month_start)
+        end = min(next_month, cutoff)
+
+        first_last = conn.execute(
+            'SELECT MIN(id), MAX(id) FROM analyses WHERE ts_epoch >= ? AND ts_epoch < ?', (start, end)
+        ).fetchone()
+        if first_last[0] is not None:
+            filename = f'analyses-{month}-{first_last[0]}-{first_last[1]}.ndjson.gz'
+            summary = _write_archive(os.path.join(archive_dir, filename), _records(conn, start, end))
+            if summary is None:
+                # 그 사이 다른 연결이 이 달의 기록을 모두 지움
+                print(f"⚠️ 보관할 기록 없음: {month}")
+                month_start = next_month
+                continue
+
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO archives (file, month, rows, first_ts, last_ts, '
+                    'score_sum, score_max, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (filename, month, summary['rows'], summary['first_ts'], summary['last_ts'],
+                     summary['score_sum'], summary['score_max'], int(time.time()))
+                )
+                # 탐지 결과는 ON DELETE CASCADE 로 함께 삭제
+                conn.execute(
+                    'DELETE FROM analyses WHERE ts_epoch >= ? AND ts_epoch < ? AND id <= ?',
+                    (start, end, first_last[1])
+                )
+            total += summary['rows']
+            print(f"✅ 기록 보관: {filename} ({summary['rows']}건)")
+
+        month_start = next_month
+
+    with conn:
+        set_meta(conn, 'archive_watermark', max(cutoff, archive_watermark(conn)))
+
+    freed = incremental_vacuum()
+    print(f"✅ 보관 완료: {total}건, {freed}페이지 반환")
+    return total
+
+
+def iter_archived(archive_dir='archive', start=None, end=None):
+    """보관 파일의 기록을 저장 순서대로 (파일 단위로 스트리밍)"""
+    conn = get_connection()
+    files = conn.execute(
+        'SELECT file FROM archives WHERE last_ts >= ? AND first_ts <= ? ORDER BY first_ts, file',
+        (start or 0, end if end is not None else 2 ** 62)
+    ).fetchall()
+
+    for (filename,) in files:
+        path = os.path.join(archive_dir, filename)
+        if not os.path.exists(path):
+            print(f"⚠️ 보관 파일 없음: {path}")
+            continue
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if start is not None and record['ts_epoch'] < start:
+                    continue
+                if end is not None and record['ts_epoch'] > end:
+                    continue
+                yield record
+
+
+def export_history(out, archive_dir='archive', start=None, end=None):
+    """
+    보관분 + DB 기록을 같은 형식(탐지 결과 포함)의 NDJSON 으로 출력 (python db.py export)
+
+    Returns:
+        int: 출력한 기록 수
+    """
+    count = 0
+    for record in iter_archived(archive_dir, start, end):
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+
+    live_end = end + 1 if end is not None else 2 ** 62
+    for record in _records(get_connection(), start or 0, live_end):
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+
+    return count
@@ -0,0 +1,138 @@
+# backend/utils/history_writer.py
+"""
+분석 기록 백그라운드 저장
+- /analyze 는 기록을 제한된 대기열에 넣고 바로 응답 (SQLite 커밋을 기다리지 않음)
+- 저장 스레드가 batch_size 개가 모이거나 flush_interval 이 지나면 한 트랜잭션으로 커밋
+- 대기열이 가득 차면 put_timeout 까지 기다리고, 그래도 가득 차면 요청 스레드에서 직접 저장
+- 종료 시 남은 기록을 모두 저장
+"""
+import queue
+import threading
+import time
+from datetime import datetime
+
+from db import save_analyses
+
+_STOP = object()
+
+
+class HistoryWriter:
+    """save_analysis 를 모아서 저장하는 백그라운드 작성기"""
+
+    def __init__(self, max_queue=1000, batch_size=50, flush_interval=0.5, put_timeout=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._metrics = {
+            'submitted': 0,
+            'written': 0,
+            'batches': 0,
+            'failed': 0,
+            'sync_fallbacks': 0,
+            'commit_ms_max': 0.0
+        }
+
+        self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+        self._thread.start()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._metrics[name] += n
+
+    def submit(self, score, detections, report, image_name):
+        """
+        분석 기록 저장 요청 (시각은 지금 기준)
+
+        Returns:
+            bool: 대기열에 넣었으면 True, 가득 차서 직접 저장했으면 False
+        """
+        record = {
+            'score': score,
+            'detections': detections,
+            'report': report,
+            'image_name': image_name,
+            'timestamp': datetime.now()
+        }
+        self._count('submitted')
+
+        try:
+            self._queue.put(record, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            # 역압: 저장이 밀리면 요청이 직접 저장하며 속도를 늦춤
+            self._count('sync_fallbacks')
+            self._write([record])
+            return False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+
+        # 종료 요청 뒤에 들어온 기록까지 저장
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for i in range(0, len(rest), self.batch_size):
+            self._write(rest[i:i + self.batch_size])
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        try:
+            save_analyses(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"⚠️ DB 저장 실패: {e}")
+                self._count('failed')
+                return
+            # 한 건 때문에 전체가 롤백된 경우 하나씩 다시 저장
+            print(f"⚠️ 일괄 저장 실패, 개별 저장으로 재시도: {e}")
+            for record in batch:
+                self._write([record])
+            return
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._metrics['written'] += len(batch)
+            self._metrics['batches'] += 1
+            self._metrics['commit_ms_max'] = max(self._metrics['commit_ms_max'], elapsed_ms)
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['queued'] = self._queue.qsize()
+        return metrics
+
+    def shutdown(self, timeout=30):
+        """대기 중인 기록을 모두 저장하고 종료"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
@@ -0,0 +1,96 @@
+# backend/utils/image_encoding.py
+"""
+결과 이미지 인코딩
+- 출력 포맷(JPEG/WebP), 품질, 프로그레시브 JPEG 설정
+- 썸네일 피라미드 (여러 너비로 축소본 생성)
+"""
+import hashlib
+
+import cv2
+
+FORMATS = {
+    'jpeg': {'ext': 'jpg', 'mimetype': 'image/jpeg'},
+    'webp': {'ext': 'webp', 'mimetype': 'image/webp'},
+}
+
+
+class ImageEncoder:
+    """결과 이미지 인코딩 설정"""
+
+    def __init__(self, fmt='jpeg', quality=82, progressive=True, thumbnail_widths=(320, 640, 1280)):
+        if fmt not in FORMATS:
+            raise ValueError(f"지원하지 않는 출력 포맷: {fmt}")
+
+        self.fmt = fmt
+        self.quality = quality
+        self.progressive = progressive
+        self.thumbnail_widths = sorted(set(thumbnail_widths))
+
+    @property
+    def extension(self):
+        return FORMATS[self.fmt]['ext']
+
+    @property
+    def mimetype(self):
+        return FORMATS[self.fmt]['mimetype']
+
+    def fingerprint(self, render_version=1):
+        """인코딩 설정 지문 (설정이 바뀌면 결과 URL 캐시도 바뀌도록)"""
+        raw = f"{render_version}:{self.fmt}:{self.quality}:{self.progressive}:{self.thumbnail_widths}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:8]
+
+    def encode(self, img):
+        """
+        이미지를 설정된 포맷으로 인코딩
+
+        Returns:
+            bytes: 인코딩된 이미지
+        """
+        if self.fmt == 'webp':
+            params = [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        else:
+            params = [
+                cv2.IMWRITE_JPEG_QUALITY, self.quality,
+                cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+                cv2.IMWRITE_JPEG_PROGRESSIVE, 1 if self.progressive else 0
+            ]
+
+        ok, buf = cv2.imencode('.' + self.extension, img, params)
+        if not ok:
+            raise ValueError(f"이미지 인코딩 실패 ({self.fmt})")
+        return buf.tobytes()
+
+    def thumbnails(self, img):
+        """
+        썸네일 피라미드 생성 (원본보다 좁은 너비만)
+
+        Returns:
+            dict: {너비: 축소 이미지}
+        """
+        h, w = img.shape[:2]
+        pyramid = {}
+        source = img
+
+        # 큰 것부터 줄여 가며 이전 단계를 재사용
+        for width in reversed(self.thumbnail_widths):
+            if width >= w:
+                continue
+            height = max(1, round(h * width / w))
+            source = cv2.resize(source, (width, height), interpolation=cv2.INTER_AREA)
+            pyramid[width] = source
+
+        return pyramid
+
+    def pick_width(self, requested):
+        """
+        요청 너비에 맞는 썸네일 너비 선택
+
+        요청보다 크거나 같은 것 중 가장 작은 너비, 없으면 None(원본)
+        """
+        if not requested or requested <= 0:
+            return None
+
+        for width in self.thumbnail_widths:
+            if width >= requested:
+                return width
+        return None
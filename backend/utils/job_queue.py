@@ -0,0 +1,193 @@
+# backend/utils/job_queue.py
+"""
+분석 작업 대기열 (POST /analyze/async)
+- 제출 즉시 작업 id 반환, 제한된 작업 스레드 풀이 분석 파이프라인 실행
+- 단계별 진행 상태(대기/실행/완료)와 최종 결과를 GET /jobs/<id> 로 조회
+- 대기열 한도 (가득 차면 제출 거절 → 429), 끝난 작업 보관 기간 (TTL)
+- 대기 중인 작업은 취소 가능 (실행 중인 작업은 끝까지 실행)
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class AnalysisJob:
+    """분석 작업 하나 (상태 + 단계별 진행)"""
+
+    def __init__(self, job_id, stages):
+        self.id = job_id
+        self.state = QUEUED
+        self.stages = OrderedDict((stage, QUEUED) for stage in stages)
+        self.current_stage = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        completed = sum(1 for status in self.stages.values() if status == DONE)
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.current_stage,
+            "stages": [{"name": stage, "state": state} for stage, state in self.stages.items()],
+            "progress": round(completed / len(self.stages), 3) if self.stages else 0,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result
+        }
+
+
+class AnalysisJobQueue:
+    """제한된 스레드 풀 위의 분석 작업 대기열"""
+
+    def __init__(self, stages, max_workers=2, max_queue=16, ttl=600, max_jobs=500):
+        self.stages = list(stages)
+        self.max_queue = max_queue  # 대기 중인 작업 최대 수 (실행 중 제외)
+        self.ttl = ttl  # 끝난 작업을 보관하는 시간 (초)
+        self.max_jobs = max_jobs
+
+        self._jobs = OrderedDict()  # {id: AnalysisJob} (오래된 것부터)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analyze')
+
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'rejected': 0,
+            'run_ms_total': 0.0,
+            'wait_ms_total': 0.0
+        }
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        작업 제출: fn(*args, progress=..., **kwargs) 를 작업 스레드에서 실행
+
+        fn 은 각 단계 시작 시 progress(단계 이름) 을 호출하고 결과 dict 를 반환한다.
+
+        Returns:
+            AnalysisJob | None: 대기열이 가득 차면 None
+        """
+        with self._lock:
+            self._purge()
+            queued = sum(1 for job in self._jobs.values() if job.state == QUEUED)
+            if queued >= self.max_queue:
+                self._metrics['rejected'] += 1
+                return None
+
+            job = AnalysisJob(uuid.uuid4().hex, self.stages)
+            self._jobs[job.id] = job
+            self._metrics['submitted'] += 1
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job.state != QUEUED:
+                return  # 대기 중 취소됨
+            job.state = RUNNING
+            job.started_at = time.time()
+            self._metrics['wait_ms_total'] += (job.started_at - job.created_at) * 1000
+
+        def progress(stage):
+            with self._lock:
+                if job.current_stage is not None:
+                    job.stages[job.current_stage] = DONE
+                job.current_stage = stage
+                job.stages[stage] = RUNNING
+
+        try:
+            result = fn(*args, progress=progress, **kwargs)
+        except Exception as e:
+            print(f"⚠️ 분석 작업 실패 ({job.id}): {e}")
+            with self._lock:
+                if job.current_stage is not None:
+                    job.stages[job.current_stage] = FAILED
+                job.state = FAILED
+                job.error = str(e)
+                self._finish(job)
+            return
+
+        with self._lock:
+            for stage in job.stages:
+                job.stages[stage] = DONE
+            job.current_stage = None
+            job.state = DONE
+            job.result = result
+            self._finish(job)
+
+    def _finish(self, job):
+        """_lock 보유 상태에서 호출"""
+        job.finished_at = time.time()
+        self._metrics['completed' if job.state == DONE else 'failed'] += 1
+        self._metrics['run_ms_total'] += (job.finished_at - job.started_at) * 1000
+
+    def get(self, job_id):
+        """작업 상태 dict (없거나 만료되면 None)"""
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def cancel(self, job_id):
+        """
+        대기 중인 작업 취소
+
+        Returns:
+            str | None: 취소 후 상태 (cancelled 이면 취소됨, running/done 등은 취소 불가), 없으면 None
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished_at = time.time()
+                for stage in job.stages:
+                    job.stages[stage] = CANCELLED
+                self._metrics['cancelled'] += 1
+            return job.state
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            states = [job.state for job in self._jobs.values()]
+
+        metrics['queued'] = states.count(QUEUED)
+        metrics['running'] = states.count(RUNNING)
+        metrics['max_queue'] = self.max_queue
+        finished = metrics['completed'] + metrics['failed']
+        metrics['run_ms_avg'] = round(metrics['run_ms_total'] / finished, 2) if finished else 0
+        return metrics
+
+    def _purge(self):
+        """_lock 보유 상태에서 호출: TTL 이 지난 작업, 개수 초과 시 오래된 끝난 작업부터 삭제"""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) < self.max_jobs and (job.finished_at is None or now - job.finished_at <= self.ttl):
+                continue
+            if job.state in FINISHED:
+                del self._jobs[job_id]
+
+    def shutdown(self):
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state == QUEUED:
+                    job.state = CANCELLED
+        self._executor.shutdown(wait=False, cancel_futures=True)
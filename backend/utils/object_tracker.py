@@ -4,65 +4,193 @@
 - 여러 번 업로드된 이미지에서 같은 물건 추적
 - 반복적으로 문제를 일으키는 물건 식별
 """
-import json
+import heapq
 import os
-from datetime import datetime, timedelta
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
 import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from utils.track_store import TrackStore
+
+
+def iou_matrix(boxes1, boxes2):
+    """
+    IoU 행렬 계산 (벡터화)
+    
+    Args:
+        boxes1: (N, 4) [x1, y1, x2, y2]
+        boxes2: (M, 4) [x1, y1, x2, y2]
+    
+    Returns:
+        np.ndarray: (N, M) IoU
+    """
+    a = np.asarray(boxes1, dtype=np.float64)[:, None, :]
+    b = np.asarray(boxes2, dtype=np.float64)[None, :, :]
+    
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter_area = inter_w * inter_h
+    
+    area1 = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area2 = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union_area = area1 + area2 - inter_area
+    
+    return np.divide(inter_area, union_area, out=np.zeros_like(inter_area), where=union_area > 0)
+
+
+# 정리가 필요한 위치
+PROBLEM_LOCATIONS = ('floor', 'bed_surface')
+
+
+class Track:
+    """
+    트랙 하나 (최근 관측 링 버퍼 + 누적 카운터)
+    
+    history 는 최근 history_size 개만 보관하고,
+    통계는 누적 카운터로 계산하므로 전체 이력을 다시 훑지 않는다.
+    """
+    __slots__ = (
+        'track_id', 'object', 'first_seen', 'last_seen', 'last_seen_ts', 'history',
+        'appearances', 'location_counts', 'problem_count'
+    )
+    
+    def __init__(self, track_id, obj, first_seen, history_size,
+                 last_seen=None, appearances=0, location_counts=None, problem_count=0):
+        self.track_id = track_id
+        self.object = obj
+        self.first_seen = first_seen
+        self.last_seen = last_seen or first_seen
+        self.last_seen_ts = datetime.fromisoformat(self.last_seen).timestamp()
+        self.history = deque(maxlen=history_size)
+        self.appearances = appearances
+        self.location_counts = dict(location_counts or {})
+        self.problem_count = problem_count
+    
+    def add(self, observation, seen_at):
+        """관측 추가 + 카운터 갱신 (seen_at: 관측 시각 epoch 초)"""
+        location = observation['location']
+        self.history.append(observation)
+        self.last_seen = observation['timestamp']
+        self.last_seen_ts = seen_at
+        self.appearances += 1
+        self.location_counts[location] = self.location_counts.get(location, 0) + 1
+        if location in PROBLEM_LOCATIONS:
+            self.problem_count += 1
+    
+    @property
+    def last_bbox(self):
+        return self.history[-1]['bbox']
+    
+    @property
+    def problem_ratio(self):
+        return self.problem_count / self.appearances if self.appearances else 0
+
+
+def _check_retention(days):
+    """보관 기간 검증 (0 이하면 새 트랙이 같은 update() 안에서 바로 만료됨)"""
+    if isinstance(days, bool) or not isinstance(days, (int, float)) or not days > 0:
+        raise ValueError(f"보관 기간은 0보다 큰 숫자여야 합니다: {days!r}")
+
 
 class SimpleObjectTracker:
     """간단한 IoU 기반 객체 추적기"""
     
-    def __init__(self, iou_threshold=0.3, state_file='tracker_state.json'):
+    def __init__(self, iou_threshold=0.3, db_path='tracker_state.db',
+                 legacy_state_file='tracker_state.json', history_size=20,
+                 retention_days=7, write_behind=False, flush_every=20, flush_interval=2.0):
+        _check_retention(retention_days)
         self.iou_threshold = iou_threshold
-        self.state_file = state_file
-        self.tracks = {}  # {track_id: {...}}
+        self.history_size = history_size
+        self.retention_days = retention_days
+        self.store = TrackStore(
+            db_path, legacy_state_file, history_size=history_size,
+            write_behind=write_behind, flush_every=flush_every, flush_interval=flush_interval
+        )
+        self.tracks = {}  # {track_id: Track}
         self.next_track_id = 0
+        # 물체 종류별 트랙 인덱스 {object: {track_id: 최근 bbox}}
+        self._by_class = defaultdict(dict)
+        # 문제 트랙 순위 인덱스 (심각도 최소 힙, 갱신된 트랙의 이전 키는 꺼낼 때 무시)
+        self._problem_rank = []  # [(-problem_count, -problem_ratio, int(track_id))]
+        self._rank_keys = {}  # {track_id: 현재 순위 키}
+        # 만료 인덱스 (마지막 관측 시각 최소 힙, 갱신된 트랙의 이전 항목은 꺼낼 때 무시)
+        self._expiry_heap = []  # [(last_seen_ts, int(track_id))]
         
         # 상태 로드
         self._load_state()
     
+    def _rebuild_class_index(self):
+        self._by_class = defaultdict(dict)
+        self._problem_rank = []
+        self._rank_keys = {}
+        self._expiry_heap = []
+        for track_id, track in self.tracks.items():
+            self._by_class[track.object][track_id] = track.last_bbox
+            self._update_rank(track)
+            self._expiry_heap.append((track.last_seen_ts, int(track_id)))
+        heapq.heapify(self._expiry_heap)
+    
+    def _update_rank(self, track):
+        """
+        트랙의 문제 순위 키 갱신 (문제 관측이 없으면 인덱스에서 제외)
+        
+        새 키를 힙에 넣기만 하고 이전 키는 그대로 두므로 O(log n).
+        이전 키는 _rank_keys 와 다르므로 읽을 때 버린다.
+        """
+        if track.problem_count > 0:
+            # 동점이면 먼저 생긴 트랙이 앞 (기존 정렬과 동일)
+            key = (-track.problem_count, -track.problem_ratio, int(track.track_id))
+            if self._rank_keys.get(track.track_id) == key:
+                return
+            self._rank_keys[track.track_id] = key
+            heapq.heappush(self._problem_rank, key)
+        else:
+            self._rank_keys.pop(track.track_id, None)
+        
+        # 버려질 이전 키가 쌓이면 힙 재구성
+        if len(self._problem_rank) > 2 * len(self._rank_keys) + 64:
+            self._problem_rank = list(self._rank_keys.values())
+            heapq.heapify(self._problem_rank)
+    
     def _load_state(self):
         """저장된 추적 상태 로드"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.tracks = data.get('tracks', {})
-                    self.next_track_id = data.get('next_track_id', 0)
-                print(f"✅ 추적 상태 로드: {len(self.tracks)}개 트랙")
-            except Exception as e:
-                print(f"⚠️ 상태 로드 실패: {e}")
+        try:
+            rows, self.next_track_id = self.store.load()
+            self.tracks = {}
+            for track_id, row in rows.items():
+                track = Track(
+                    track_id, row['object'], row['first_seen'], self.history_size,
+                    last_seen=row['last_seen'],
+                    appearances=row['appearances'],
+                    location_counts=row['location_counts'],
+                    problem_count=row['problem_count']
+                )
+                track.history.extend(row['history'])
+                if track.history:
+                    self.tracks[track_id] = track
+            self._rebuild_class_index()
+            print(f"✅ 추적 상태 로드: {len(self.tracks)}개 트랙")
+        except Exception as e:
+            print(f"⚠️ 상태 로드 실패: {e}")
     
-    def _save_state(self):
-        """추적 상태 저장"""
+    def _save_changes(self, touched_ids, new_observations, removed_ids):
+        """이번 update() 의 변경분만 저장 (같은 update() 에서 제거된 트랙의 관측은 제외)"""
+        removed = set(removed_ids)
         try:
-            data = {
-                'tracks': self.tracks,
-                'next_track_id': self.next_track_id
-            }
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.store.apply_update(
+                {tid: self.tracks[tid] for tid in touched_ids if tid in self.tracks},
+                [(tid, o) for tid, o in new_observations if tid not in removed],
+                removed_ids,
+                self.next_track_id
+            )
         except Exception as e:
             print(f"⚠️ 상태 저장 실패: {e}")
     
-    def iou(self, bbox1, bbox2):
-        """IoU 계산"""
-        x1_1, y1_1, x2_1, y2_1 = bbox1
-        x1_2, y1_2, x2_2, y2_2 = bbox2
-        
-        xi1 = max(x1_1, x1_2)
-        yi1 = max(y1_1, y1_2)
-        xi2 = min(x2_1, x2_2)
-        yi2 = min(y2_1, y2_2)
-        
-        inter_area = max(0, xi2 - xi1) * max(0, yi2 - yi1)
-        
-        box1_area = (x2_1 - x1_1) * (y2_1 - y1_1)
-        box2_area = (x2_2 - x1_2) * (y2_2 - y1_2)
-        union_area = box1_area + box2_area - inter_area
-        
-        return inter_area / union_area if union_area > 0 else 0
-    
     def update(self, detections, image_name):
         """
         새로운 프레임의 탐지 결과로 추적 업데이트
@@ -71,126 +199,188 @@ class SimpleObjectTracker:
             detections: YOLO 탐지 결과 리스트
             image_name: 이미지 파일명
         """
-        timestamp = datetime.now().isoformat()
+        now = datetime.now()
+        timestamp = now.isoformat()
+        seen_at = now.timestamp()
         
         # 기존 트랙과 매칭
         matched_tracks = set()
+        new_observations = []  # [(track_id, observation)]
+        
+        # 물체 종류별로 묶어서 같은 종류의 트랙과만 매칭
+        by_class = defaultdict(list)
+        for i, detection in enumerate(detections):
+            by_class[detection['name']].append(i)
+        
+        assignment = {}  # {detection index: track_id}
+        for obj_name, det_indices in by_class.items():
+            assignment.update(self._associate(obj_name, det_indices, detections))
         
-        for detection in detections:
+        for i, detection in enumerate(detections):
             bbox = detection['bbox']
             obj_name = detection['name']
             location = detection.get('location', 'unknown')
             
-            # 가장 유사한 트랙 찾기
-            best_track_id = None
-            best_iou = 0
-            
-            for track_id, track in self.tracks.items():
-                # 같은 물체 종류만 비교
-                if track['object'] != obj_name:
-                    continue
-                
-                # 최근 bbox와 IoU 계산
-                last_bbox = track['history'][-1]['bbox']
-                current_iou = self.iou(bbox, last_bbox)
-                
-                if current_iou > self.iou_threshold and current_iou > best_iou:
-                    best_iou = current_iou
-                    best_track_id = track_id
+            observation = {
+                'bbox': bbox,
+                'location': location,
+                'timestamp': timestamp,
+                'image': image_name
+            }
             
-            # 매칭된 트랙 업데이트
-            if best_track_id is not None:
-                self.tracks[best_track_id]['history'].append({
-                    'bbox': bbox,
-                    'location': location,
-                    'timestamp': timestamp,
-                    'image': image_name
-                })
-                self.tracks[best_track_id]['last_seen'] = timestamp
-                matched_tracks.add(best_track_id)
+            track_id = assignment.get(i)
             
             # 새 트랙 생성
-            else:
-                new_track_id = str(self.next_track_id)
+            if track_id is None:
+                track_id = str(self.next_track_id)
                 self.next_track_id += 1
-                
-                self.tracks[new_track_id] = {
-                    'object': obj_name,
-                    'first_seen': timestamp,
-                    'last_seen': timestamp,
-                    'history': [{
-                        'bbox': bbox,
-                        'location': location,
-                        'timestamp': timestamp,
-                        'image': image_name
-                    }]
-                }
-                matched_tracks.add(new_track_id)
-        
-        # 오래된 트랙 정리 (7일 이상 안 보인 것)
-        self._cleanup_old_tracks(days=7)
-        
-        # 상태 저장
-        self._save_state()
-    
-    def _cleanup_old_tracks(self, days=7):
-        """오래된 트랙 제거"""
-        cutoff = datetime.now() - timedelta(days=days)
+                self.tracks[track_id] = Track(track_id, obj_name, timestamp, self.history_size)
+            
+            # 관측 추가 (매칭된 트랙이면 카운터 누적)
+            self.tracks[track_id].add(observation, seen_at)
+            self._update_rank(self.tracks[track_id])
+            heapq.heappush(self._expiry_heap, (seen_at, int(track_id)))
+            
+            self._by_class[obj_name][track_id] = bbox
+            matched_tracks.add(track_id)
+            new_observations.append((track_id, observation))
+        
+        # 오래된 트랙 정리 (보관 기간 이상 안 보인 것)
+        removed = self._cleanup_old_tracks()
+        
+        # 변경분만 저장
+        self._save_changes(matched_tracks, new_observations, removed)
+    
+    def _associate(self, obj_name, det_indices, detections):
+        """
+        한 물체 종류의 탐지와 트랙을 최적 할당 (헝가리안)
+        
+        한 트랙에는 탐지 하나만 할당되며, IoU 가 임계값 이하인 쌍은 매칭하지 않는다.
+        
+        Returns:
+            dict: {detection index: track_id}
+        """
+        candidates = self._by_class.get(obj_name)
+        if not candidates:
+            return {}
+        
+        track_ids = list(candidates)
+        ious = iou_matrix(
+            [detections[i]['bbox'] for i in det_indices],
+            list(candidates.values())
+        )
+        
+        # 임계값 이하 쌍은 가중치 0 → 할당되더라도 아래에서 버림
+        weights = np.where(ious > self.iou_threshold, ious, 0.0)
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        
+        return {
+            det_indices[r]: track_ids[c]
+            for r, c in zip(rows, cols)
+            if weights[r, c] > 0
+        }
+    
+    def _cleanup_old_tracks(self, days=None):
+        """
+        오래된 트랙 제거
+        
+        만료 힙에서 기준 시각보다 오래된 항목만 꺼내므로
+        만료된 트랙이 없으면 전체 트랙을 훑지 않는다.
+        
+        Args:
+            days: 보관 기간 (None이면 retention_days)
+        
+        Returns:
+            list: 제거된 트랙 id 목록
+        """
+        days = self.retention_days if days is None else days
+        cutoff = time.time() - days * 86400
         
         to_remove = []
-        for track_id, track in self.tracks.items():
-            last_seen = datetime.fromisoformat(track['last_seen'])
-            if last_seen < cutoff:
-                to_remove.append(track_id)
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+            seen_at, track_id = heapq.heappop(self._expiry_heap)
+            track = self.tracks.get(str(track_id))
+            
+            # 이후 다시 관측된 트랙의 이전 항목이면 무시
+            if track is None or track.last_seen_ts != seen_at:
+                continue
+            
+            to_remove.append(str(track_id))
         
         for track_id in to_remove:
-            del self.tracks[track_id]
+            track = self.tracks.pop(track_id)
+            self._by_class[track.object].pop(track_id, None)
+            track.problem_count = 0
+            self._update_rank(track)
+        
+        # 무시된 항목이 쌓이면 힙 재구성
+        if len(self._expiry_heap) > 2 * len(self.tracks) + 64:
+            self._expiry_heap = [(t.last_seen_ts, int(tid)) for tid, t in self.tracks.items()]
+            heapq.heapify(self._expiry_heap)
+        
+        return to_remove
     
-    def get_problem_objects(self, min_appearances=3):
+    def get_problem_objects(self, min_appearances=3, limit=None):
         """
         반복적으로 문제를 일으키는 물건 찾기
         
+        update() 에서 유지하는 순위 힙에서 필요한 만큼만 꺼내 읽고
+        (다 읽으면 다시 넣음) 전체 트랙을 다시 계산하거나 정렬하지 않는다.
+        
         Args:
             min_appearances: 최소 출현 횟수
+            limit: 최대 개수 (None이면 전부)
         
         Returns:
-            list: 문제 물건 리스트
+            list: 문제 물건 리스트 (문제 횟수, 문제 비율 내림차순)
         """
+        if min_appearances < 1:
+            # 문제 관측이 없는 트랙도 포함해야 하는데 순위 힙에는 없으므로 전체 정렬
+            problems = [self._problem_entry(track) for track in self.tracks.values()]
+            problems.sort(key=lambda x: (x['problem_count'], x['problem_ratio']), reverse=True)
+            return problems if limit is None else problems[:limit]
+        
         problems = []
+        taken = []  # 꺼낸 유효 키 (끝나면 다시 넣음)
         
-        for track_id, track in self.tracks.items():
-            total_appearances = len(track['history'])
-            
-            if total_appearances < min_appearances:
-                continue
-            
-            # 문제 위치 카운트
-            problem_locations = ['floor', 'bed_surface']
-            problem_count = sum(
-                1 for h in track['history']
-                if h['location'] in problem_locations
-            )
-            
-            # 문제 비율
-            problem_ratio = problem_count / total_appearances
-            
-            if problem_count >= min_appearances:
-                problems.append({
-                    'track_id': track_id,
-                    'object': track['object'],
-                    'total_appearances': total_appearances,
-                    'problem_count': problem_count,
-                    'problem_ratio': problem_ratio,
-                    'first_seen': track['first_seen'],
-                    'last_seen': track['last_seen'],
-                    'message': f"{track['object']}이(가) {problem_count}번 문제 위치에서 발견되었습니다"
-                })
-        
-        # 문제 심각도 순 정렬
-        problems.sort(key=lambda x: (x['problem_count'], x['problem_ratio']), reverse=True)
+        try:
+            while self._problem_rank:
+                key = self._problem_rank[0]
+                neg_count, _, track_id = key
+                
+                # 이후 갱신된 트랙의 이전 키면 버림
+                if self._rank_keys.get(str(track_id)) != key:
+                    heapq.heappop(self._problem_rank)
+                    continue
+                
+                # 문제 횟수 내림차순이므로 기준 미만이 나오면 끝
+                if -neg_count < min_appearances or (limit is not None and len(problems) >= limit):
+                    break
+                
+                taken.append(heapq.heappop(self._problem_rank))
+                track = self.tracks[str(track_id)]
+                if track.appearances < min_appearances:
+                    continue
+                
+                problems.append(self._problem_entry(track))
+        finally:
+            for key in taken:
+                heapq.heappush(self._problem_rank, key)
         
         return problems
     
+    def _problem_entry(self, track):
+        return {
+            'track_id': track.track_id,
+            'object': track.object,
+            'total_appearances': track.appearances,
+            'problem_count': track.problem_count,
+            'problem_ratio': track.problem_ratio,
+            'first_seen': track.first_seen,
+            'last_seen': track.last_seen,
+            'message': f"{track.object}이(가) {track.problem_count}번 문제 위치에서 발견되었습니다"
+        }
+    
     def get_statistics(self):
         """추적 통계"""
         if not self.tracks:
@@ -200,11 +390,8 @@ class SimpleObjectTracker:
                 'most_common_object': None
             }
         
-        # 물체별 카운트
-        object_counts = {}
-        for track in self.tracks.values():
-            obj = track['object']
-            object_counts[obj] = object_counts.get(obj, 0) + 1
+        # 물체별 카운트 (종류별 인덱스 크기)
+        object_counts = {obj: len(ids) for obj, ids in self._by_class.items() if ids}
         
         most_common = max(object_counts.items(), key=lambda x: x[1]) if object_counts else (None, 0)
         
@@ -219,15 +406,193 @@ class SimpleObjectTracker:
         """모든 추적 정보 초기화"""
         self.tracks = {}
         self.next_track_id = 0
-        self._save_state()
+        self._by_class = defaultdict(dict)
+        self._problem_rank = []
+        self._rank_keys = {}
+        self._expiry_heap = []
+        self.store.reset()
         print("✅ 추적 정보 초기화됨")
 
-# 싱글톤 인스턴스
-_tracker = None
+# 방(사용자) 키 형식
+ROOM_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+DEFAULT_ROOM = 'default'
+
+
+def is_valid_room(room):
+    return bool(ROOM_KEY_PATTERN.match(room or ''))
+
+
+class RoomLimitError(Exception):
+    """저장된 방 수가 max_rooms 에 도달해 새 방을 만들 수 없음"""
+
+
+class TrackerRegistry:
+    """
+    방(사용자)별 추적기 샤드
+    - 샤드는 처음 요청될 때 저장소에서 로드
+    - 메모리에는 최근 사용한 max_shards 개만 유지 (LRU, 상태는 이미 저장되어 있음)
+    - 샤드마다 잠금이 따로 있어 서로 다른 방의 요청은 경쟁하지 않음
+      (샤드 저장/닫기 같은 디스크 작업은 레지스트리 잠금 밖에서)
+    - 디스크에 저장되는 방은 최대 max_rooms 개 (그 이상 새 방은 거절)
+    """
+    
+    def __init__(self, max_shards=32, max_rooms=1000, storage_dir='trackers',
+                 default_db='tracker_state.db', **tracker_kwargs):
+        self.max_shards = max_shards
+        self.max_rooms = max_rooms
+        self.storage_dir = storage_dir
+        self.default_db = default_db
+        self.tracker_kwargs = tracker_kwargs
+        # 샤드는 요청 때 만들어지므로 잘못된 설정은 여기서 미리 거절
+        if 'retention_days' in tracker_kwargs:
+            _check_retention(tracker_kwargs['retention_days'])
+        
+        self._shards = OrderedDict()  # {room: SimpleObjectTracker} (오래된 것부터)
+        # {room: [샤드 잠금, 사용 중인 스레드 수]} (로드된 방 + 사용 중인 방만 유지)
+        self._shard_locks = {}
+        self._lock = threading.Lock()  # _shards / _shard_locks / _rooms 보호용 (짧게만 보유)
+        
+        os.makedirs(storage_dir, exist_ok=True)
+        self._rooms = {DEFAULT_ROOM} | {
+            name[:-len('.db')] for name in os.listdir(storage_dir)
+            if name.endswith('.db') and is_valid_room(name[:-len('.db')])
+        }
+    
+    def _db_path(self, room):
+        if room == DEFAULT_ROOM:
+            return self.default_db
+        return os.path.join(self.storage_dir, f'{room}.db')
+    
+    def admits(self, room):
+        """이미 있는 방이거나 새 방을 만들 여유가 있는지"""
+        with self._lock:
+            return room in self._rooms or len(self._rooms) < self.max_rooms
+    
+    def _enter(self, room):
+        """샤드 잠금 항목을 사용 중으로 표시하고 반환 (잠금은 호출한 쪽에서)"""
+        with self._lock:
+            if room not in self._rooms:
+                if len(self._rooms) >= self.max_rooms:
+                    raise RoomLimitError(f"방 수 제한({self.max_rooms}) 초과: {room}")
+                self._rooms.add(room)
+            
+            entry = self._shard_locks.setdefault(room, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry
+    
+    def _leave(self, room, entry):
+        """사용 종료: 아무도 쓰지 않고 메모리에도 없는 방의 잠금 항목은 삭제"""
+        with self._lock:
+            entry[1] -= 1
+            if entry[1] == 0 and room not in self._shards:
+                self._shard_locks.pop(room, None)
+    
+    def _load(self, room):
+        """샤드 잠금 보유 상태에서 호출: 메모리에 없으면 로드"""
+        with self._lock:
+            tracker = self._shards.get(room)
+            if tracker is not None:
+                self._shards.move_to_end(room)
+                return tracker
+        
+        # 로드는 다른 방을 막지 않도록 레지스트리 잠금 밖에서
+        tracker = SimpleObjectTracker(
+            db_path=self._db_path(room),
+            legacy_state_file='tracker_state.json' if room == DEFAULT_ROOM else None,
+            **self.tracker_kwargs
+        )
+        
+        with self._lock:
+            self._shards[room] = tracker
+            victims = self._pick_victims(keep=room)
+        
+        self._close(victims)
+        return tracker
+    
+    def _pick_victims(self, keep):
+        """
+        _lock 보유 상태에서 호출: 아무도 쓰지 않는 오래된 샤드부터 메모리에서 내림
+        
+        내린 샤드는 잠금을 잡은 채로 반환 → 닫는 동안 같은 방의 새 요청은 기다렸다가 다시 로드
+        
+        Returns:
+            list: [(room, tracker, entry)]
+        """
+        victims = []
+        for room in list(self._shards):
+            if len(self._shards) <= self.max_shards:
+                break
+            if room == keep:
+                continue
+            
+            entry = self._shard_locks.setdefault(room, [threading.Lock(), 0])
+            if entry[1] > 0:
+                continue  # 사용 중이거나 기다리는 요청이 있는 샤드는 건너뜀
+            
+            entry[0].acquire()  # 사용자가 없으므로 바로 잡힘
+            entry[1] += 1
+            victims.append((room, self._shards.pop(room), entry))
+        return victims
+    
+    def _close(self, victims):
+        """레지스트리 잠금 밖에서 내린 샤드 저장 + 닫기"""
+        for room, tracker, entry in victims:
+            try:
+                tracker.store.close()
+            except Exception as e:
+                print(f"⚠️ 추적기 샤드 닫기 실패 ({room}): {e}")
+            finally:
+                entry[0].release()
+                self._leave(room, entry)
+    
+    @contextmanager
+    def session(self, room=DEFAULT_ROOM):
+        """
+        샤드 잠금을 잡고 추적기 사용
+        
+        Usage:
+            with registry.session(room) as tracker:
+                tracker.update(...)
+        
+        Raises:
+            RoomLimitError: 새 방인데 방 수 제한에 도달한 경우
+        """
+        entry = self._enter(room)
+        try:
+            with entry[0]:
+                yield self._load(room)
+        finally:
+            self._leave(room, entry)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded_shards': len(self._shards),
+                'max_shards': self.max_shards,
+                'rooms': len(self._rooms),
+                'max_rooms': self.max_rooms
+            }
+
+
+# 레지스트리 싱글톤
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_tracker_registry():
+    """TrackerRegistry 싱글톤"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TrackerRegistry(
+                max_shards=int(os.getenv("TRACKER_MAX_SHARDS", "32")),
+                max_rooms=int(os.getenv("TRACKER_MAX_ROOMS", "1000")),
+                retention_days=float(os.getenv("TRACK_RETENTION_DAYS", "7")),
+                write_behind=os.getenv("TRACKER_WRITE_BEHIND", "true").lower() == "true",
+                flush_every=int(os.getenv("TRACKER_FLUSH_EVERY", "20")),
+                flush_interval=float(os.getenv("TRACKER_FLUSH_INTERVAL", "2"))
+            )
+    return _registry
 
-def get_tracker():
-    """SimpleObjectTracker 싱글톤"""
-    global _tracker
-    if _tracker is None:
-        _tracker = SimpleObjectTracker()
-    return _tracker
+def tracker_session(room=DEFAULT_ROOM):
+    """방별 추적기를 샤드 잠금과 함께 사용하는 컨텍스트"""
+    return get_tracker_registry().session(room)
@@ -0,0 +1,124 @@
+# backend/utils/render_pool.py
+"""
+결과 이미지 백그라운드 렌더링 풀
+- /analyze 응답 전에 시각화를 기다리지 않도록 뷰 렌더링을 작업 풀에 제출
+- 대기열 깊이 제한 (가득 차면 제출 거절 → 요청 시 지연 렌더링으로 대체)
+- 제출/완료/실패/거절 횟수 및 렌더링 시간 지표
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class RenderPool:
+    """ResultViewCache 뷰를 미리 렌더링하는 제한된 작업 풀"""
+
+    def __init__(self, view_cache, max_workers=2, max_queue=32):
+        self.view_cache = view_cache
+        self.max_queue = max_queue
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='render'
+        )
+        self._pending = {}  # {filename: Future}
+        self._lock = threading.Lock()
+
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'render_ms_total': 0.0,
+            'render_ms_max': 0.0
+        }
+
+    def submit(self, filename):
+        """
+        뷰 렌더링 작업 제출
+
+        Returns:
+            bool: 제출 여부 (이미 준비됨/대기 중이면 True, 대기열이 가득 차면 False)
+        """
+        if self.view_cache.contains(filename):
+            return True
+
+        with self._lock:
+            if filename in self._pending:
+                return True
+            if len(self._pending) >= self.max_queue:
+                self._metrics['rejected'] += 1
+                return False
+
+            future = self._executor.submit(self._render, filename)
+            self._pending[filename] = future
+            self._metrics['submitted'] += 1
+
+        future.add_done_callback(lambda _: self._finish(filename))
+        return True
+
+    def _render(self, filename):
+        start = time.perf_counter()
+        try:
+            path = self.view_cache.get(filename)
+        except Exception as e:
+            print(f"⚠️ 백그라운드 렌더링 실패 ({filename}): {e}")
+            with self._lock:
+                self._metrics['failed'] += 1
+            raise
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._metrics['completed'] += 1
+            self._metrics['render_ms_total'] += elapsed_ms
+            self._metrics['render_ms_max'] = max(self._metrics['render_ms_max'], elapsed_ms)
+        return path
+
+    def _finish(self, filename):
+        with self._lock:
+            self._pending.pop(filename, None)
+
+    def is_ready(self, filename):
+        """뷰가 디스크에 준비되었는지"""
+        return self.view_cache.contains(filename)
+
+    def wait(self, filename, timeout):
+        """
+        대기 중인 렌더링을 최대 timeout초 기다림
+
+        Returns:
+            bool: 더 기다릴 필요가 없으면 True (완료, 실패 또는 대기 작업 없음)
+        """
+        with self._lock:
+            future = self._pending.get(filename)
+
+        if future is None:
+            return True
+
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception:
+            # 실패한 작업은 요청 경로에서 다시 렌더링을 시도한다
+            pass
+        return True
+
+    def metrics(self):
+        """렌더링 풀 지표"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = len(self._pending)
+
+        metrics['max_queue'] = self.max_queue
+        finished = metrics['completed']
+        metrics['render_ms_avg'] = (
+            round(metrics['render_ms_total'] / finished, 1) if finished else 0.0
+        )
+        metrics['render_ms_total'] = round(metrics['render_ms_total'], 1)
+        metrics['render_ms_max'] = round(metrics['render_ms_max'], 1)
+        return metrics
+
+    def shutdown(self, wait=True):
+        """대기 중인 작업을 처리하고 풀 종료"""
+        self._executor.shutdown(wait=wait)
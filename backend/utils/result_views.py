@@ -0,0 +1,345 @@
+# backend/utils/result_views.py
+"""
+결과 이미지 지연 렌더링
+- /analyze 는 분석 상태(탐지, 쌓임, 구역 라벨맵)만 저장
+- /results/<name> 첫 요청 때 뷰를 렌더링해 결과 저장소(ArtifactStore)에 캐시
+- 결과 파일은 업로드 내용 해시 + 뷰 + 크기로 이름 붙임
+- URL ?v= 와 ETag 에는 렌더링 설정 지문 + 분석 상태 해시가 들어감
+  (같은 업로드를 다른 결과로 다시 분석하면 URL/ETag 도 바뀜)
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from utils.artifact_store import atomic_write, is_valid_key
+from utils.heatmap import render_heatmap
+from utils.room_segmentation import render_room_zones, zone_label_map, zone_masks_from_labels
+from utils.stacking_visualizer import render_stacks
+from utils.detection_visualizer import render_detections
+from utils.image_encoding import ImageEncoder
+
+# 그리기 코드가 바뀌면 올려서 클라이언트 캐시를 무효화
+RENDER_VERSION = 1
+
+# 뷰 이름 → 결과 파일명 접두사 ('result'는 접두사 없음)
+VIEW_PREFIXES = {
+    'heatmap': 'heatmap_',
+    'zones': 'zones_',
+    'stacks': 'stacks_',
+}
+
+
+def view_filename(view, key):
+    """뷰 이름과 업로드 키로 결과 파일명 생성 (/results/<파일명>)"""
+    return VIEW_PREFIXES.get(view, '') + key
+
+
+def parse_view_filename(filename):
+    """
+    결과 파일명을 (뷰 이름, 업로드 키)로 분해
+
+    Returns:
+        tuple | None: 올바른 결과 파일명이 아니면 None
+    """
+    view, key = 'result', filename
+    for name, prefix in VIEW_PREFIXES.items():
+        if filename.startswith(prefix):
+            view, key = name, filename[len(prefix):]
+            break
+
+    return (view, key) if is_valid_key(key) else None
+
+
+def available_views(state):
+    """분석 상태로 렌더링 가능한 뷰 목록"""
+    views = ['result']
+    if state['detections']:
+        views.append('heatmap')
+    if state['zone_labels'] is not None:
+        views.append('zones')
+    if state['stacks']:
+        views.append('stacks')
+    return views
+
+
+def render_view(view, state):
+    """
+    분석 상태로 뷰 이미지 렌더링
+
+    Returns:
+        np.ndarray: 렌더링된 이미지
+    """
+    img = cv2.imread(state['image_path'])
+    if img is None:
+        raise FileNotFoundError(f"원본 이미지를 읽을 수 없습니다: {state['image_path']}")
+
+    if view == 'result':
+        return render_detections(img, state['detections'], state['stacks'])
+    if view == 'heatmap':
+        return render_heatmap(img, state['detections'])
+    if view == 'zones':
+        return render_room_zones(img, zone_masks_from_labels(state['zone_labels']))
+    if view == 'stacks':
+        return render_stacks(img, state['stacks'])
+
+    raise ValueError(f"알 수 없는 뷰: {view}")
+
+
+class ResultViewCache:
+    """분석 상태 저장 + 렌더링된 뷰 캐시 (저장은 ArtifactStore 가 담당)"""
+
+    def __init__(self, store, state_dir, encoder=None):
+        self.store = store
+        self.state_dir = state_dir
+        self.encoder = encoder or ImageEncoder()
+
+        self._lock = threading.Lock()
+        self._render_locks = {}
+        self._state_hashes = {}  # {key: 분석 상태 해시} (ETag 계산 시 디스크 읽기 방지)
+
+        os.makedirs(state_dir, exist_ok=True)
+
+    @property
+    def fingerprint(self):
+        """렌더링 결과를 결정하는 설정의 지문"""
+        return self.encoder.fingerprint(RENDER_VERSION)
+
+    def version(self, key):
+        """
+        업로드 뷰의 버전 (URL ?v= 값): 렌더링 설정 지문 + 분석 상태 해시
+
+        Returns:
+            str | None: 저장된 분석 상태가 없으면 None
+        """
+        state_hash = self.state_hash(key)
+        if state_hash is None:
+            return None
+        return f"{self.fingerprint}.{state_hash}"
+
+    def etag(self, filename, width=None):
+        """
+        결과 파일의 ETag (디스크를 읽지 않고 계산)
+
+        결과는 업로드 내용 + 뷰 + 크기 + 렌더링 설정 + 분석 상태로 결정되므로
+        그 조합의 해시를 내용 해시로 쓴다.
+
+        Returns:
+            str | None: 올바른 결과 파일명이 아니거나 분석 상태가 없으면 None
+        """
+        parsed = parse_view_filename(filename)
+        if parsed is None:
+            return None
+
+        view, key = parsed
+        version = self.version(key)
+        if version is None:
+            return None
+
+        width = self.encoder.pick_width(width)
+        raw = f"{key}:{self._variant(view, width)}:{version}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+    def _variant(self, view, width):
+        """저장소 변형 이름: <view>.<full|w너비>.<확장자>"""
+        size = 'full' if width is None else f'w{width}'
+        return f"{view}.{size}.{self.encoder.extension}"
+
+    # ------------------------------------------
+    # 분석 상태
+    # ------------------------------------------
+    def _state_paths(self, key):
+        base = os.path.join(self.state_dir, key)
+        return base + '.json', base + '.npz'
+
+    def save_state(self, key, image_path, detections, stacks, room_masks):
+        """
+        뷰 렌더링에 필요한 최소 상태 저장
+
+        상태가 바뀐 경우에만 이전에 렌더링된 뷰를 무효화한다
+        (같은 업로드를 다시 분석하면 캐시된 뷰를 그대로 쓴다).
+
+        Returns:
+            list: 렌더링 가능한 뷰 이름 목록
+        """
+        json_path, labels_path = self._state_paths(key)
+
+        state = {
+            'image_path': image_path,
+            'detections': detections,
+            'stacks': stacks,
+            'has_zones': room_masks is not None
+        }
+        digest = hashlib.sha256(json.dumps(state, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+        labels = None
+        if room_masks is not None:
+            label_map = zone_label_map(room_masks)
+            digest.update(f"{label_map.shape}:{label_map.dtype}".encode('utf-8'))
+            digest.update(np.ascontiguousarray(label_map).tobytes())
+
+            buf = io.BytesIO()
+            np.savez_compressed(buf, labels=label_map)
+            labels = buf.getvalue()
+
+        # 구역 라벨맵까지 포함한 해시 → 라벨맵만 바뀌어도 뷰 무효화 + 새 URL/ETag
+        state['state_hash'] = digest.hexdigest()[:16]
+        state_json = json.dumps(state, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+        changed = True
+        if os.path.exists(json_path):
+            with open(json_path, 'rb') as f:
+                changed = f.read() != state_json
+
+        if changed:
+            if labels is not None:
+                atomic_write(labels_path, labels)
+            elif os.path.exists(labels_path):
+                os.remove(labels_path)
+            atomic_write(json_path, state_json)
+            self.invalidate(key)
+
+        with self._lock:
+            self._state_hashes[key] = state['state_hash']
+
+        return available_views({
+            'detections': detections,
+            'stacks': stacks,
+            'zone_labels': room_masks
+        })
+
+    def load_state(self, key):
+        """저장된 분석 상태 로드 (없으면 None)"""
+        json_path, labels_path = self._state_paths(key)
+        if not os.path.exists(json_path):
+            return None
+
+        with open(json_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        state.pop('state_hash', None)
+        state['zone_labels'] = None
+        if state.pop('has_zones', False) and os.path.exists(labels_path):
+            with np.load(labels_path) as data:
+                state['zone_labels'] = data['labels']
+
+        return state
+
+    def state_hash(self, key):
+        """
+        저장된 분석 상태의 해시 (처음 한 번만 상태 파일을 읽음)
+
+        Returns:
+            str | None: 상태가 없으면 None
+        """
+        with self._lock:
+            cached = self._state_hashes.get(key)
+        if cached is not None:
+            return cached
+
+        json_path, _ = self._state_paths(key)
+        try:
+            with open(json_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+
+        # state_hash 가 없는 이전 형식은 상태 파일 내용 해시로 대신
+        state_hash = json.loads(raw).get('state_hash') or hashlib.sha256(raw).hexdigest()[:16]
+        with self._lock:
+            self._state_hashes[key] = state_hash
+        return state_hash
+
+    def drop_state(self, key):
+        """업로드가 삭제되면 상태와 렌더링된 뷰도 함께 삭제"""
+        with self._lock:
+            self._state_hashes.pop(key, None)
+        for path in self._state_paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.invalidate(key)
+
+    # ------------------------------------------
+    # 뷰 캐시
+    # ------------------------------------------
+    def invalidate(self, key):
+        """업로드의 렌더링된 뷰 전부 삭제"""
+        self.store.remove(key)
+
+    def contains(self, filename):
+        """렌더링된 뷰(원본 크기)가 캐시에 있는지 (렌더링하지 않음)"""
+        parsed = parse_view_filename(filename)
+        if parsed is None:
+            return False
+
+        view, key = parsed
+        return self.store.contains(key, self._variant(view, None))
+
+    def _lookup(self, view, key, width):
+        """캐시된 변형 경로 (원본보다 넓은 썸네일은 없으므로 원본으로 대체)"""
+        if width is not None:
+            path = self.store.get(key, self._variant(view, width))
+            if path is not None:
+                return path
+        return self.store.get(key, self._variant(view, None))
+
+    def get(self, filename, width=None):
+        """
+        결과 파일 경로 반환 (캐시에 없으면 렌더링 후 저장)
+
+        Args:
+            filename: 결과 파일명 (/results/<filename>)
+            width: 원하는 너비 (None이면 원본 크기)
+
+        Returns:
+            str | None: 결과 파일 경로, 렌더링할 수 없으면 None
+        """
+        parsed = parse_view_filename(filename)
+        if parsed is None:
+            return None
+
+        view, key = parsed
+        width = self.encoder.pick_width(width)
+
+        path = self._lookup(view, key, width)
+        if path is not None:
+            return path
+
+        with self._lock:
+            render_lock = self._render_locks.setdefault(filename, threading.Lock())
+
+        # 같은 뷰를 동시에 두 번 렌더링하지 않도록 파일별 잠금
+        with render_lock:
+            path = self._lookup(view, key, width)
+            if path is not None:
+                return path
+
+            try:
+                rendered = self._render(view, key)
+            finally:
+                with self._lock:
+                    self._render_locks.pop(filename, None)
+
+        return self._lookup(view, key, width) if rendered else None
+
+    def _render(self, view, key):
+        state = self.load_state(key)
+        if state is None or view not in available_views(state):
+            return False
+
+        img = render_view(view, state)
+
+        # 원본 + 썸네일 피라미드를 한 번에 인코딩 (썸네일 먼저 → 원본이 가장 최근 사용)
+        thumbnails = self.encoder.thumbnails(img)
+        for width, thumb in thumbnails.items():
+            self.store.put(key, self._variant(view, width), self.encoder.encode(thumb))
+        self.store.put(key, self._variant(view, None), self.encoder.encode(img))
+
+        print(f"✅ 결과 뷰 렌더링: {view}_{key} ({len(thumbnails) + 1}개 크기)")
+        return True
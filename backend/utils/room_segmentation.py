@@ -6,24 +6,39 @@ YOLOv8 Segmentation 기반 방 구역 분석
 from ultralytics import YOLO
 import cv2
 import numpy as np
+import threading
 
 # Segmentation 모델 싱글톤
+# (같은 모델 객체를 여러 스레드가 동시에 predict 하지 않도록 로드/추론을 잠금으로 직렬화)
 _seg_model = None
+_seg_lock = threading.Lock()
+
+# 구역 시각화 색상 (라벨맵 순서이기도 함)
+ZONE_COLORS = {
+    'floor': (0, 0, 255),      # 빨강
+    'bed': (0, 255, 255),      # 노랑
+    'desk': (0, 255, 0),       # 초록
+    'furniture': (255, 128, 0) # 주황
+}
 
 def get_segmentation_model():
     """YOLOv8-seg 모델 로드 (싱글톤)"""
     global _seg_model
-    if _seg_model is None:
-        print("📥 YOLOv8-seg 모델 로드 중...")
-        _seg_model = YOLO("yolov8x-seg.pt")
-        print("✅ 모델 로드 완료")
+    with _seg_lock:
+        if _seg_model is None:
+            print("📥 YOLOv8-seg 모델 로드 중...")
+            _seg_model = YOLO("yolov8x-seg.pt")
+            print("✅ 모델 로드 완료")
     return _seg_model
 
 
-def segment_room_areas(image_path):
+def segment_room_areas(image):
     """
     방 이미지를 구역별로 분할
     
+    Args:
+        image: 이미지 경로 또는 이미 디코딩된 BGR 이미지 (np.ndarray)
+    
     Returns:
         dict: {
             'floor_mask': np.array,
@@ -35,10 +50,12 @@ def segment_room_areas(image_path):
     """
     model = get_segmentation_model()
     
-    # Segmentation 수행
-    results = model.predict(source=image_path, conf=0.3, verbose=False)
+    img = cv2.imread(image) if isinstance(image, str) else image
+    
+    # Segmentation 수행 (요청 간 동시 호출 방지)
+    with _seg_lock:
+        results = model.predict(source=img, conf=0.3, verbose=False)
     
-    img = cv2.imread(image_path)
     h, w = img.shape[:2]
     
     # 빈 마스크 생성
@@ -153,18 +170,25 @@ def visualize_room_zones(image_path, room_masks, output_path):
     """
     img = cv2.imread(image_path)
     
-    # 색상 정의
-    colors = {
-        'floor': (0, 0, 255),      # 빨강
-        'bed': (0, 255, 255),      # 노랑
-        'desk': (0, 255, 0),       # 초록
-        'furniture': (255, 128, 0) # 주황
-    }
+    cv2.imwrite(output_path, render_room_zones(img, room_masks))
+    print(f"✅ 구역 시각화 저장: {output_path}")
+
+
+def render_room_zones(img, room_masks):
+    """
+    구역 색상 오버레이 이미지 생성 (파일 저장 없음)
+    
+    Args:
+        img: 원본 이미지 (BGR ndarray)
+        room_masks: segment_room_areas() 또는 zone_masks_from_labels()의 리턴값
     
+    Returns:
+        np.ndarray: 구역이 표시된 이미지
+    """
     overlay = img.copy()
     
     # 각 마스크를 반투명 색상으로 표시
-    for area_name, color in colors.items():
+    for area_name, color in ZONE_COLORS.items():
         mask = room_masks[f'{area_name}_mask']
         overlay[mask > 0] = color
     
@@ -173,11 +197,40 @@ def visualize_room_zones(image_path, room_masks, output_path):
     
     # 범례 추가
     legend_y = 30
-    for area_name, color in colors.items():
+    for area_name, color in ZONE_COLORS.items():
         cv2.rectangle(result, (10, legend_y), (40, legend_y + 20), color, -1)
         cv2.putText(result, area_name.capitalize(), (50, legend_y + 15),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         legend_y += 30
     
-    cv2.imwrite(output_path, result)
-    print(f"✅ 구역 시각화 저장: {output_path}")
+    return result
+
+
+def zone_label_map(room_masks):
+    """
+    구역 마스크 4장을 라벨맵 1장(uint8)으로 압축
+    
+    시각화와 같은 순서로 덮어쓰므로 겹치는 픽셀은 나중 구역이 차지한다.
+    0 = 구역 없음, 1~4 = ZONE_COLORS 순서
+    
+    Returns:
+        np.ndarray: (h, w) uint8 라벨맵
+    """
+    label_map = np.zeros(room_masks['floor_mask'].shape, dtype=np.uint8)
+    
+    for label, area_name in enumerate(ZONE_COLORS, start=1):
+        label_map[room_masks[f'{area_name}_mask'] > 0] = label
+    
+    return label_map
+
+
+def zone_masks_from_labels(label_map):
+    """
+    zone_label_map()의 라벨맵을 render_room_zones()용 마스크 dict로 복원
+    """
+    masks = {
+        f'{area_name}_mask': (label_map == label).astype(np.uint8)
+        for label, area_name in enumerate(ZONE_COLORS, start=1)
+    }
+    masks['detected_areas'] = []
+    return masks
@@ -17,6 +17,23 @@ def visualize_stacks(image_path, detections, stacks, output_path):
     """
     img = cv2.imread(image_path)
     
+    cv2.imwrite(output_path, render_stacks(img, stacks))
+    print(f"✅ 쌓임 시각화 저장: {output_path}")
+
+
+def render_stacks(img, stacks):
+    """
+    쌓임 그룹 표시 이미지 생성 (파일 저장 없음)
+    
+    Args:
+        img: 원본 이미지 (BGR ndarray)
+        stacks: detect_stacks() 결과
+    
+    Returns:
+        np.ndarray: 쌓임 그룹이 표시된 이미지
+    """
+    img = img.copy()
+    
     # 각 쌓임 그룹 표시
     for stack in stacks:
         x1, y1, x2, y2 = map(int, stack['bounding_box'])
@@ -61,8 +78,7 @@ def visualize_stacks(image_path, detections, stacks, output_path):
             cv2.putText(img, f"High Risk: {high_count}", (10, stats_y + 35),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
     
-    cv2.imwrite(output_path, img)
-    print(f"✅ 쌓임 시각화 저장: {output_path}")
+    return img
 
 
 def draw_stack_connections(image_path, detections, stacks, output_path):
@@ -0,0 +1,486 @@
+# backend/utils/track_store.py
+"""
+객체 추적 상태 SQLite 저장소
+- tracks / observations 테이블 분리 (물체 종류, 마지막 관측 시각 인덱스)
+- WAL 모드, update() 마다 새 관측만 기록 (전체 상태 재작성 없음)
+- 트랙별 관측은 최근 history_size 개만 보관, 누적 카운터는 tracks 에 저장
+- 최초 실행 시 기존 tracker_state.json 을 옮겨 담음
+- write-behind: 변경분은 저널(NDJSON, fsync)에만 추가하고 백그라운드에서 모아서 DB 에 반영
+  (재시작 시 반영되지 않은 저널을 다시 적용, 적용할 수 없는 항목은 .rejected 로 옮김)
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+
+from utils.artifact_store import atomic_write
+
+# 정리가 필요한 위치 (object_tracker.PROBLEM_LOCATIONS 와 동일)
+PROBLEM_LOCATIONS = ('floor', 'bed_surface')
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS tracks (
+        track_id INTEGER PRIMARY KEY,
+        object TEXT NOT NULL,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        appearances INTEGER NOT NULL DEFAULT 0,
+        problem_count INTEGER NOT NULL DEFAULT 0,
+        location_counts TEXT NOT NULL DEFAULT '{}'
+    );
+    CREATE INDEX IF NOT EXISTS idx_tracks_object ON tracks(object);
+    CREATE INDEX IF NOT EXISTS idx_tracks_last_seen ON tracks(last_seen);
+
+    CREATE TABLE IF NOT EXISTS observations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        track_id INTEGER NOT NULL REFERENCES tracks(track_id) ON DELETE CASCADE,
+        x1 INTEGER NOT NULL,
+        y1 INTEGER NOT NULL,
+        x2 INTEGER NOT NULL,
+        y2 INTEGER NOT NULL,
+        location TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        image TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_observations_track ON observations(track_id, id);
+
+    CREATE TABLE IF NOT EXISTS tracker_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+'''
+
+
+JOURNAL_SUFFIX = '.journal'
+REJECTED_SUFFIX = '.rejected'
+
+
+class TrackFlusher:
+    """
+    write-behind 저장소들의 백그라운드 반영 스레드 (프로세스당 하나)
+    - interval 초마다, 또는 저장소가 wake() 로 깨우면 대기 중인 변경분을 반영
+    """
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._stores = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='track-flusher', daemon=True)
+        self._thread.start()
+
+    def register(self, store):
+        with self._lock:
+            self._stores.add(store)
+
+    def unregister(self, store):
+        with self._lock:
+            self._stores.discard(store)
+
+    def wake(self):
+        self._wake.set()
+
+    def flush_all(self):
+        with self._lock:
+            stores = list(self._stores)
+        for store in stores:
+            try:
+                store.flush()
+            except Exception as e:
+                print(f"⚠️ 추적 상태 반영 실패 ({store.db_path}): {e}")
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush_all()
+
+    def shutdown(self):
+        """종료 시 남은 변경분 반영"""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=10)
+        self.flush_all()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+def get_flusher(interval=2.0):
+    """TrackFlusher 싱글톤 (종료 시 자동 반영)"""
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = TrackFlusher(interval)
+            atexit.register(_flusher.shutdown)
+    return _flusher
+
+
+class TrackStore:
+    """SimpleObjectTracker 영속화 계층"""
+
+    def __init__(self, db_path='tracker_state.db', legacy_state_file='tracker_state.json',
+                 history_size=20, write_behind=False, flush_every=20, flush_interval=2.0):
+        self.db_path = db_path
+        self.legacy_state_file = legacy_state_file
+        self.history_size = history_size
+        self.write_behind = write_behind
+        self.flush_every = flush_every
+        self.journal_path = db_path + JOURNAL_SUFFIX
+        self.rejected_path = db_path + REJECTED_SUFFIX
+        self._lock = threading.Lock()  # DB 연결
+        self._journal_lock = threading.Lock()  # 저널 파일 + 대기 목록
+        self._flush_lock = threading.Lock()  # 반영 작업 직렬화
+        self._pending = []  # 저널에는 있고 DB 에는 아직 반영 안 된 변경분
+        self._journal = None
+        self._closed = False
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # write-behind 는 커밋 직후 저널을 잘라 내므로 커밋 자체가 디스크에 남아야 함
+        # (WAL + NORMAL 은 전원이 꺼지면 마지막 커밋을 잃을 수 있음)
+        self._conn.execute('PRAGMA synchronous=FULL' if write_behind else 'PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+        self._migrate_legacy_json()
+
+        self._next_seq = self._replay_journal() + 1
+        if write_behind:
+            self._journal = open(self.journal_path, 'ab')
+            self._flusher = get_flusher(flush_interval)
+            self._flusher.register(self)
+
+    @staticmethod
+    def _counters(observations):
+        """관측 목록 → (appearances, problem_count, location_counts JSON)"""
+        location_counts = {}
+        for o in observations:
+            location_counts[o['location']] = location_counts.get(o['location'], 0) + 1
+        problem_count = sum(location_counts.get(loc, 0) for loc in PROBLEM_LOCATIONS)
+        return len(observations), problem_count, json.dumps(location_counts, ensure_ascii=False)
+
+    def _migrate_legacy_json(self):
+        """tracker_state.json → SQLite (DB가 비어 있을 때 한 번만)"""
+        if not self.legacy_state_file or not os.path.exists(self.legacy_state_file):
+            return
+
+        with self._lock:
+            if self._conn.execute('SELECT 1 FROM tracks LIMIT 1').fetchone():
+                return
+
+            try:
+                with open(self.legacy_state_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"⚠️ 기존 추적 상태 마이그레이션 실패: {e}")
+                return
+
+            tracks = data.get('tracks', {})
+            with self._conn:
+                for track_id, track in tracks.items():
+                    history = track['history']
+                    appearances, problem_count, location_counts = self._counters(history)
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO tracks (track_id, object, first_seen, last_seen, '
+                        'appearances, problem_count, location_counts) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (int(track_id), track['object'], track['first_seen'], track['last_seen'],
+                         appearances, problem_count, location_counts)
+                    )
+                    # 최근 관측만 보관
+                    self._insert_observations([(track_id, o) for o in history[-self.history_size:]])
+                self._set_next_track_id(data.get('next_track_id', 0))
+
+        os.replace(self.legacy_state_file, self.legacy_state_file + '.migrated')
+        print(f"✅ 추적 상태 마이그레이션: {len(tracks)}개 트랙 (JSON → SQLite)")
+
+    def _applied_seq(self):
+        row = self._conn.execute(
+            "SELECT value FROM tracker_meta WHERE key = 'journal_seq'"
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def _replay_journal(self):
+        """
+        반영되지 않은 저널 항목을 DB 에 적용 (비정상 종료 복구)
+
+        마지막 줄이 쓰다 만 상태면 버린다 (fsync 전이라 응답하지 않은 변경분).
+        이미 반영된 항목(seq <= journal_seq)은 건너뛰므로 여러 번 재생해도 안전하다.
+        항목마다 따로 적용하고, 적용에 실패한 항목은 .rejected 파일로 옮긴다
+        (잘못된 항목 하나 때문에 저장소를 열지 못하는 일이 없도록).
+
+        Returns:
+            int: 마지막 seq
+        """
+        with self._lock:
+            last_seq = self._applied_seq()
+            if not os.path.exists(self.journal_path):
+                return last_seq
+
+            changes = []
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except ValueError:
+                        break
+                    if change['seq'] > last_seq:
+                        changes.append(change)
+
+            rejected = []
+            for change in changes:
+                try:
+                    with self._conn:
+                        self._apply_changes([change])
+                except Exception as e:
+                    print(f"⚠️ 추적 저널 항목 적용 실패 (seq {change['seq']}): {e}")
+                    rejected.append({'error': str(e), 'change': change})
+
+            if rejected:
+                with open(self.rejected_path, 'ab') as f:
+                    for entry in rejected:
+                        f.write(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                print(f"⚠️ 추적 저널: {len(rejected)}개 항목을 {self.rejected_path} 로 옮김")
+            if changes:
+                last_seq = changes[-1]['seq']
+                print(f"✅ 추적 저널 복구: {len(changes) - len(rejected)}개 변경분 반영")
+
+            os.remove(self.journal_path)
+            return last_seq
+
+    # ------------------------------------------
+    # 읽기
+    # ------------------------------------------
+    def load(self):
+        """
+        전체 추적 상태 로드
+
+        Returns:
+            tuple: ({track_id: 트랙 정보 dict}, next_track_id)
+        """
+        with self._lock:
+            tracks = {}
+            for row in self._conn.execute(
+                'SELECT track_id, object, first_seen, last_seen, appearances, problem_count, '
+                'location_counts FROM tracks ORDER BY track_id'
+            ):
+                track_id, obj, first_seen, last_seen, appearances, problem_count, location_counts = row
+                tracks[str(track_id)] = {
+                    'object': obj,
+                    'first_seen': first_seen,
+                    'last_seen': last_seen,
+                    'appearances': appearances,
+                    'problem_count': problem_count,
+                    'location_counts': json.loads(location_counts),
+                    'history': []
+                }
+
+            for track_id, x1, y1, x2, y2, location, timestamp, image in self._conn.execute(
+                'SELECT track_id, x1, y1, x2, y2, location, timestamp, image '
+                'FROM observations ORDER BY track_id, id'
+            ):
+                track = tracks.get(str(track_id))
+                if track is not None:
+                    track['history'].append({
+                        'bbox': [x1, y1, x2, y2],
+                        'location': location,
+                        'timestamp': timestamp,
+                        'image': image
+                    })
+
+            row = self._conn.execute(
+                "SELECT value FROM tracker_meta WHERE key = 'next_track_id'"
+            ).fetchone()
+            next_track_id = int(row[0]) if row else 0
+
+        return tracks, next_track_id
+
+    # ------------------------------------------
+    # 쓰기
+    # ------------------------------------------
+    def _insert_observations(self, observations):
+        """observations: [(track_id, observation)]"""
+        self._conn.executemany(
+            'INSERT INTO observations (track_id, x1, y1, x2, y2, location, timestamp, image) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [
+                (int(track_id), *map(int, o['bbox']), o['location'], o['timestamp'], o.get('image'))
+                for track_id, o in observations
+            ]
+        )
+
+    def _prune(self, track_id):
+        """트랙의 관측을 최근 history_size 개만 남김"""
+        self._conn.execute(
+            'DELETE FROM observations WHERE track_id = ? AND id NOT IN ('
+            '  SELECT id FROM observations WHERE track_id = ? ORDER BY id DESC LIMIT ?'
+            ')',
+            (int(track_id), int(track_id), self.history_size)
+        )
+
+    def _set_next_track_id(self, next_track_id):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tracker_meta (key, value) VALUES ('next_track_id', ?)",
+            (str(next_track_id),)
+        )
+
+    def apply_update(self, touched_tracks, new_observations, removed_track_ids, next_track_id):
+        """
+        update() 한 번의 변경분 기록
+
+        write-behind 모드에서는 저널에 추가(fsync)만 하고 반환한다.
+        DB 반영은 flush_every 개가 쌓이거나 flush_interval 마다 백그라운드에서.
+
+        Args:
+            touched_tracks: {track_id: Track} 새로 생겼거나 관측이 추가된 트랙
+            new_observations: [(track_id, observation)] 이번에 추가된 관측
+            removed_track_ids: 삭제된 트랙 id 목록
+            next_track_id: 다음 트랙 id
+        """
+        # Track 은 이후에도 바뀌므로 지금 값으로 직렬화
+        change = {
+            'tracks': [
+                [int(track_id), t.object, t.first_seen, t.last_seen, t.appearances,
+                 t.problem_count, t.location_counts]
+                for track_id, t in touched_tracks.items()
+            ],
+            'observations': [
+                [int(track_id), [int(v) for v in o['bbox']], o['location'], o['timestamp'], o.get('image')]
+                for track_id, o in new_observations
+            ],
+            'removed': [int(t) for t in removed_track_ids],
+            'next_track_id': next_track_id
+        }
+
+        if not self.write_behind:
+            with self._lock, self._conn:
+                change['seq'] = self._next_seq
+                self._next_seq += 1
+                self._apply_changes([change])
+            return
+
+        with self._journal_lock:
+            change['seq'] = self._next_seq
+            self._next_seq += 1
+            self._journal.write(json.dumps(change, ensure_ascii=False).encode('utf-8') + b'\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending.append(change)
+            full = len(self._pending) >= self.flush_every
+
+        if full:
+            self._flusher.wake()
+
+    def _apply_changes(self, changes):
+        """lock + 트랜잭션 안에서 호출: 변경분을 순서대로 적용"""
+        touched = set()
+        for change in changes:
+            self._conn.executemany(
+                'INSERT INTO tracks (track_id, object, first_seen, last_seen, '
+                'appearances, problem_count, location_counts) VALUES (?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(track_id) DO UPDATE SET '
+                'last_seen = excluded.last_seen, appearances = excluded.appearances, '
+                'problem_count = excluded.problem_count, location_counts = excluded.location_counts',
+                [
+                    (*row[:6], json.dumps(row[6], ensure_ascii=False))
+                    for row in change['tracks']
+                ]
+            )
+
+            self._conn.executemany(
+                'INSERT INTO observations (track_id, x1, y1, x2, y2, location, timestamp, image) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(track_id, *bbox, location, timestamp, image)
+                 for track_id, bbox, location, timestamp, image in change['observations']]
+            )
+            touched.update(row[0] for row in change['tracks'])
+
+            if change['removed']:
+                self._conn.executemany(
+                    'DELETE FROM tracks WHERE track_id = ?',
+                    [(t,) for t in change['removed']]
+                )
+
+        # 변경분을 모아 반영하므로 트랙별 정리는 마지막에 한 번만
+        for track_id in touched:
+            self._prune(track_id)
+
+        self._set_next_track_id(changes[-1]['next_track_id'])
+        self._conn.execute(
+            "INSERT OR REPLACE INTO tracker_meta (key, value) VALUES ('journal_seq', ?)",
+            (str(changes[-1]['seq']),)
+        )
+
+    def flush(self):
+        """
+        대기 중인 변경분을 한 트랜잭션으로 DB 에 반영하고 저널 정리
+
+        반영하는 동안에도 요청 스레드는 저널에 계속 추가할 수 있다.
+        반영 후에는 반영된 부분만 저널에서 잘라 낸다 (나머지는 임시 파일 + rename).
+        반영에 실패하면 변경분을 대기 목록 앞에 되돌리고 저널은 그대로 둔다.
+        """
+        if not self.write_behind:
+            return
+
+        with self._flush_lock:
+            # 반영 스레드가 목록을 가져간 직후 close() 된 저장소
+            if self._closed:
+                return
+
+            with self._journal_lock:
+                batch, self._pending = self._pending, []
+                offset = self._journal.tell()
+            if not batch:
+                return
+
+            try:
+                with self._lock, self._conn:
+                    self._apply_changes(batch)
+            except Exception:
+                with self._journal_lock:
+                    self._pending[:0] = batch
+                raise
+
+            # 여기까지 커밋된 것은 offset 앞의 저널 항목 (= batch) 뿐
+            with self._journal_lock:
+                if self._journal.tell() == offset:
+                    self._journal.truncate(0)
+                    self._journal.seek(0)
+                    os.fsync(self._journal.fileno())
+                else:
+                    with open(self.journal_path, 'rb') as f:
+                        f.seek(offset)
+                        rest = f.read()
+                    self._journal.close()
+                    atomic_write(self.journal_path, rest)
+                    self._journal = open(self.journal_path, 'ab')
+
+    def reset(self):
+        """모든 추적 정보 삭제"""
+        self.flush()
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM observations')
+            self._conn.execute('DELETE FROM tracks')
+            self._set_next_track_id(0)
+
+    def close(self):
+        """남은 변경분을 반영하고 닫음"""
+        if self.write_behind:
+            self._flusher.unregister(self)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ 추적 상태 반영 실패 ({self.db_path}): {e}")
+            with self._flush_lock, self._journal_lock:
+                self._closed = True
+                self._journal.close()
+                # 반영하지 못한 변경분은 다음에 열 때 저널에서 다시 적용
+                if not self._pending:
+                    os.remove(self.journal_path)
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,5 @@
 // src/Pages/AnalysisPage.jsx
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { useImage } from "../ImageContext";
 import { AnalysisBox } from "../Components/AnalysisBox";
@@ -11,6 +11,28 @@ export function AnalysisPage() {
   const navigate = useNavigate();
   const { analysisResult } = useImage();
   const [activeView, setActiveView] = useState("normal"); // 🔥 뷰 전환
+  const [streamedAdvice, setStreamedAdvice] = useState("");
+
+  // 🔥 ChatGPT 조언 스트리밍 (SSE)
+  const adviceStreamUrl = analysisResult?.data?.adviceStreamUrl;
+  useEffect(() => {
+    if (!adviceStreamUrl) return undefined;
+
+    setStreamedAdvice("");
+    const source = new EventSource(adviceStreamUrl);
+    source.addEventListener("token", (event) => {
+      const { text } = JSON.parse(event.data);
+      setStreamedAdvice((prev) => prev + text);
+    });
+    source.addEventListener("done", (event) => {
+      const { text } = JSON.parse(event.data);
+      setStreamedAdvice(text);
+      source.close();
+    });
+    source.onerror = () => source.close();
+
+    return () => source.close();
+  }, [adviceStreamUrl]);
 
   if (!analysisResult) {
     return (
@@ -172,7 +194,7 @@ export function AnalysisPage() {
         <div className="h-full mb-20">
           <AnalysisBox
             feedback={feedback}
-            aiAdvice={aiAdvice}
+            aiAdvice={aiAdvice || streamedAdvice}
             //improvedImage={improvedImage}
             stackingData={stacking} // 🔥 추가
             trackingData={tracking} // 🔥 추가
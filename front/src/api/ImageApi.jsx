@@ -29,8 +29,11 @@ export async function uploadAndAnalyzeImage(imageFile) {
         score: backendData.report?.score || 0,
         maxScore: 100,
 
-        // 🔥 ChatGPT 조언
+        // 🔥 ChatGPT 조언 (스트리밍이면 adviceStreamUrl 로 따로 받음)
         aiAdvice: backendData.ai_advice || "",
+        adviceStreamUrl: backendData.advice?.stream_url
+          ? `http://localhost:5000${backendData.advice.stream_url}`
+          : null,
 
         // 기존 분석 요약
         feedback: generateFeedback(backendData),
@@ -129,11 +132,13 @@ function generateFeedback(backendData) {
 }
 
 /**
- * 분석 기록 조회
+ * 분석 기록 조회 (다음 페이지는 응답의 next_cursor 를 cursor 로 전달)
  */
-export async function getAnalysisHistory(limit = 10) {
+export async function getAnalysisHistory(limit = 10, cursor = null) {
   try {
-    const response = await api.get(`/history?limit=${limit}`);
+    const response = await api.get("/history", {
+      params: { limit, cursor: cursor || undefined },
+    });
     return response.data;
   } catch (error) {
     console.error("히스토리 조회 중 오류 발생:", error);
@@ -141,6 +146,21 @@ export async function getAnalysisHistory(limit = 10) {
   }
 }
 
+/**
+ * 점수 추이 조회 (bucket: "day" | "week", from/to: ISO 날짜 또는 epoch 초)
+ */
+export async function getScoreTrend({ from, to, bucket = "day" } = {}) {
+  try {
+    const response = await api.get("/history/trend", {
+      params: { from, to, bucket },
+    });
+    return response.data;
+  } catch (error) {
+    console.error("점수 추이 조회 중 오류 발생:", error);
+    throw new Error("점수 추이를 가져오는데 실패했습니다.");
+  }
+}
+
 /**
  * 통계 조회
  */